@@ -0,0 +1,173 @@
+"""
+Benchmark `CheckJsonFormat` on large synthetic JSON files.
+
+Generates settings style JSON with comments and dangling commas, then times the
+validator.  `--compare` also times the previous two pass, linear line lookup
+implementation (slow, use a small `--size`).
+
+    python benchmarks/bench_json_format.py --size 4
+    python benchmarks/bench_json_format.py --size 0.25 --compare
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tests import validate_json_format  # noqa: E402
+
+RE_OLD_COMMENT = re.compile(
+    r'''(?x)
+        (?P<comments>
+            /\*[^*]*\*+(?:[^/*][^*]*\*+)*/
+          | [ \t]*//(?:[^\r\n])*
+        )
+      | (?P<code>
+            "(?:\\.|[^"\\])*"
+          | '(?:\\.|[^'\\])*'
+          | .[^/"']*
+        )
+    ''',
+    re.DOTALL
+)
+RE_OLD_TRAILING_COMMA = re.compile(
+    r'''(?x)
+        (
+            (?P<square_comma>,(?P<square_ws>[\s\r\n]*)(?P<square_bracket>\]))
+          | (?P<curly_comma>,(?P<curly_ws>[\s\r\n]*)(?P<curly_bracket>\}))
+        )
+      | (?P<code>
+            "(?:\\.|[^"\\])*"
+          | '(?:\\.|[^'\\])*'
+          | .[^,"']*
+        )
+    ''',
+    re.DOTALL
+)
+
+
+class OldCheckJsonFormat(validate_json_format.CheckJsonFormat):
+    """The previous implementation: linear line lookup and two rewriting passes."""
+
+    def index_lines(self, text):
+        """Index the char range of each line."""
+
+        self.line_range = []
+        count = 1
+        last = 0
+        for m in re.finditer('\n', text):
+            self.line_range.append((last, m.end(0) - 1, count))
+            last = m.end(0)
+            count += 1
+
+    def get_line(self, pt):
+        """Get the line from char index."""
+
+        for r in self.line_range:
+            if pt >= r[0] and pt <= r[1]:
+                return r[2]
+        return None
+
+    def check_tokens(self, text):
+        """Strip comments, then re-index and strip dangling commas."""
+
+        def comments(m):
+            g = m.groupdict()
+            if g["code"] is None:
+                if not self.allow_comments:
+                    self.log_failure(validate_json_format.E_COMMENTS, self.get_line(m.start(0)))
+                return ''.join([x[0] for x in validate_json_format.RE_LINE_PRESERVE.findall(g["comments"])])
+            return g["code"]
+
+        def commas(m):
+            g = m.groupdict()
+            if g["code"] is None:
+                self.log_failure(validate_json_format.E_COMMA, self.get_line(m.start(0)))
+                if g["square_comma"] is not None:
+                    return g["square_ws"] + g["square_bracket"]
+                return g["curly_ws"] + g["curly_bracket"]
+            return g["code"]
+
+        text = ''.join(map(comments, RE_OLD_COMMENT.finditer(text)))
+        self.index_lines(text)
+        return ''.join(map(commas, RE_OLD_TRAILING_COMMA.finditer(text)))
+
+
+class QuietMixin(object):
+    """Count failures instead of printing them."""
+
+    def log_failure(self, code, line=None):
+        """Count failure."""
+
+        self.failures += 1
+        self.fail = True
+
+
+class Quiet(QuietMixin, validate_json_format.CheckJsonFormat):
+    """Quiet current validator."""
+
+
+class QuietOld(QuietMixin, OldCheckJsonFormat):
+    """Quiet previous validator."""
+
+
+def make_json(size):
+    """Make settings style JSON of roughly `size` bytes with comments and dangling commas."""
+
+    parts = ['{\n']
+    total = 2
+    i = 0
+    while total < size:
+        entry = (
+            '    // Setting number %d, with a "quoted", comma.\n'
+            '    "setting_%d": [\n'
+            '        "value, with // no comment",\n'
+            '        {"key": %d, "other": /* inline */ true,},\n'
+            '    ],\n'
+        ) % (i, i, i)
+        parts.append(entry)
+        total += len(entry)
+        i += 1
+    parts.append('    "last": null\n}\n')
+    return ''.join(parts)
+
+
+def run(cls, pth):
+    """Time one validator over the file."""
+
+    checker = cls(False, True)
+    checker.failures = 0
+    start = time.perf_counter()
+    checker.check_format(pth)
+    return time.perf_counter() - start, checker.failures
+
+
+def main():
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description="Benchmark the JSON format validator.")
+    parser.add_argument("--size", type=float, default=4, help="Size of the synthetic file in megabytes.")
+    parser.add_argument("--compare", action="store_true", help="Also time the previous implementation.")
+    args = parser.parse_args()
+
+    fd, pth = tempfile.mkstemp(suffix=".sublime-settings")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(make_json(int(args.size * 1024 * 1024)))
+        print("file size:  %.2f MB" % (os.path.getsize(pth) / 1024.0 / 1024.0))
+        elapsed, failures = run(Quiet, pth)
+        print("current:    %.3fs (%d failures)" % (elapsed, failures))
+        if args.compare:
+            old_elapsed, old_failures = run(QuietOld, pth)
+            print("previous:   %.3fs (%d failures)" % (old_elapsed, old_failures))
+            print("speedup:    %.1fx" % (old_elapsed / elapsed if elapsed else float("inf")))
+    finally:
+        os.remove(pth)
+
+
+if __name__ == "__main__":
+    main()
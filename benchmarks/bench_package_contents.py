@@ -0,0 +1,100 @@
+"""
+Benchmark `get_package_contents` de-duplication.
+
+Builds a synthetic package that exists both as an installed and as a default archive,
+each with the same entries, and times the old list based de-duplication against
+`ResourceSet`.
+
+    python benchmarks/bench_package_contents.py --entries 20000
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+import sublime  # noqa: E402
+
+
+def make_archive(pth, entries):
+    """Write an archive with the given number of entries."""
+
+    with zipfile.ZipFile(pth, "w") as z:
+        for i in range(entries):
+            z.writestr("folder%03d/file%05d.txt" % (i % 100, i), "")
+
+
+def in_list(x, items, windows):
+    """The old linear membership test."""
+
+    if windows:
+        for item in items:
+            if item.lower() == x.lower():
+                return True
+        return False
+    return x in items
+
+
+def old_package_contents(ps, pkg, windows):
+    """The old quadratic `get_package_contents` (archives only)."""
+
+    installed_pth, default_pth, user_pth = ps.sublime_package_paths()
+    content_files = []
+    for pth in (installed_pth, default_pth):
+        with zipfile.ZipFile(os.path.join(pth, "%s.sublime-package" % pkg), 'r') as z:
+            for item in z.infolist():
+                name = "Packages/%s/%s" % (pkg, item.filename)
+                if not in_list(name, content_files, windows):
+                    content_files.append(name)
+    return content_files
+
+
+def timed(func, *args):
+    """Time a call."""
+
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    """Run the benchmark."""
+
+    parser = argparse.ArgumentParser(description="Benchmark package content de-duplication.")
+    parser.add_argument("--entries", type=int, default=20000, help="Entries per archive.")
+    parser.add_argument("--platform", default="linux", help="Platform to emulate (windows folds case).")
+    args = parser.parse_args()
+
+    base = tempfile.mkdtemp()
+    try:
+        for folder in ("Installed Packages", os.path.join("App", "Packages"), "Packages"):
+            os.makedirs(os.path.join(base, folder))
+        make_archive(os.path.join(base, "Installed Packages", "Big.sublime-package"), args.entries)
+        make_archive(os.path.join(base, "App", "Packages", "Big.sublime-package"), args.entries)
+
+        sublime.configure(base, args.platform)
+        sys.path.insert(0, ROOT)
+        from lib import package_search as ps
+
+        windows = args.platform == "windows"
+        old_time, old = timed(old_package_contents, ps, "Big", windows)
+        new_time, new = timed(ps.get_package_contents, "Packages/Big")
+        assert old == new, "Results differ!"
+
+        print("entries per archive: %d" % args.entries)
+        print("list + in_list:      %.3fs" % old_time)
+        print("ResourceSet:         %.3fs" % new_time)
+        print("speedup:             %.1fx" % (old_time / new_time if new_time else float("inf")))
+    finally:
+        shutil.rmtree(base)
+
+
+if __name__ == "__main__":
+    main()
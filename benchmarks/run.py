@@ -0,0 +1,166 @@
+"""
+Benchmark the package search and editor launch hot paths against synthetic installs.
+
+Runs outside of Sublime with the stand-in `sublime` module in this folder.  For each
+install scale and entry point it reports the best cold (empty resource index) and warm
+wall time, the peak traced memory and the number of file system calls.
+
+    python benchmarks/run.py --archives 10,100,1000 --entries 20000
+"""
+import argparse
+import builtins
+import importlib
+import io
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+import zipfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+if HERE not in sys.path:
+    sys.path.insert(0, HERE)
+
+import sublime  # noqa: E402
+import synthetic  # noqa: E402
+
+COUNTS = {}
+COUNTING = [False]
+
+
+def counted(name, func):
+    """Wrap a function so calls are counted while counting is on."""
+
+    def wrapper(*args, **kwargs):
+        if COUNTING[0]:
+            COUNTS[name] = COUNTS.get(name, 0) + 1
+        return func(*args, **kwargs)
+    return wrapper
+
+
+def install_counters():
+    """Count file system calls.  Must run before the code under test is imported."""
+
+    for name in ("stat", "lstat", "listdir", "scandir"):
+        if hasattr(os, name):
+            setattr(os, name, counted(name, getattr(os, name)))
+    io.open = builtins.open = counted("open", builtins.open)
+    zipfile.ZipFile.__init__ = counted("zip", zipfile.ZipFile.__init__)
+
+
+def import_plugin():
+    """Import the plugin as a package, like Sublime does."""
+
+    pkg = types.ModuleType("SchemeEditor")
+    pkg.__path__ = [ROOT]
+    sys.modules["SchemeEditor"] = pkg
+    ps = importlib.import_module("SchemeEditor.lib.package_search")
+    cse = importlib.import_module("SchemeEditor.color_scheme_editor")
+    return ps, cse
+
+
+def entry_points(ps, cse):
+    """Get the entry points to measure."""
+
+    def search(find_all, workers=1, pattern="*.tmTheme", regex=False):
+        def run():
+            search = ps.PackageSearch()
+            search.window = sublime.Window()
+            search.search_workers = workers
+            search.search(pattern=pattern, regex=regex, find_all=find_all)
+        return run
+
+    def prepare_theme():
+        launch = cse.SchemeLaunch("select", "Packages/Default/default00000.tmTheme", None)
+        launch.init_settings(launch.action, launch.select_theme)
+        launch.prepare_theme(launch.action)
+
+    installed = sublime.installed_packages_path()
+    return [
+        ("scan_for_packages", lambda: ps.scan_for_packages(installed, archives=True)),
+        ("get_packages", ps.get_packages),
+        ("get_package_contents", lambda: ps.get_package_contents("Packages/Default")),
+        ("iter_package_contents 10", lambda: list(itertools.islice(ps.iter_package_contents("Packages/Default"), 10))),
+        ("iter_packages 1", lambda: next(ps.iter_packages(), None)),
+        ("find", search(False)),
+        ("find (regex)", search(False, pattern=r"Packages/Default/.*\.tmTheme$", regex=True)),
+        ("find_raw", search(True)),
+        ("find_raw (regex)", search(True, pattern=r"Packages/Default/.*\.tmTheme$", regex=True)),
+        ("find_raw (4 workers)", search(True, 4)),
+        ("prepare_theme", prepare_theme)
+    ]
+
+
+def measure(ps, func, repeat):
+    """Measure an entry point: best cold and warm time, then peak memory and calls of a cold run."""
+
+    cold = []
+    warm = []
+    for _ in range(repeat):
+        ps.RESOURCE_INDEX.clear()
+        start = time.perf_counter()
+        func()
+        cold.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        func()
+        warm.append(time.perf_counter() - start)
+
+    ps.RESOURCE_INDEX.clear()
+    COUNTS.clear()
+    COUNTING[0] = True
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        COUNTING[0] = False
+    return min(cold), min(warm), peak, dict(COUNTS)
+
+
+def main():
+    """Run the benchmarks."""
+
+    parser = argparse.ArgumentParser(description="Benchmark package search against synthetic installs.")
+    parser.add_argument("--archives", default="10,100", help="Comma separated installed archive counts.")
+    parser.add_argument("--entries", type=int, default=20000, help="Entries in the large Default archive.")
+    parser.add_argument("--folders", type=int, default=10, help="Unzipped packages.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per entry point, the best is kept.")
+    parser.add_argument("--only", default=None, help="Only run entry points containing this text.")
+    args = parser.parse_args()
+
+    install_counters()
+    ps, cse = import_plugin()
+    calls = ("stat", "lstat", "listdir", "scandir", "open", "zip")
+
+    for archives in [int(a) for a in args.archives.split(",")]:
+        root = tempfile.mkdtemp()
+        try:
+            summary = synthetic.make_install(root, archives, args.entries, args.folders)
+            sublime.configure(root)
+            print(
+                "\n%(archives)d archives, %(entries)d archive entries, %(files)d unzipped files" % summary
+            )
+            print(
+                "%-26s %9s %9s %10s " % ("entry point", "cold s", "warm s", "peak KB") +
+                " ".join("%7s" % c for c in calls)
+            )
+            for name, func in entry_points(ps, cse):
+                if args.only and args.only not in name:
+                    continue
+                cold, warm, peak, counts = measure(ps, func, args.repeat)
+                print(
+                    "%-26s %9.4f %9.4f %10.1f " % (name, cold, warm, peak / 1024.0) +
+                    " ".join("%7d" % counts.get(c, 0) for c in calls)
+                )
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""
+Stand-in for Sublime's `sublime` module.
+
+Enough of the API to run the package search and editor launch code outside of Sublime
+against a synthetic install.  Call `configure` with the install's root before use.
+Callbacks scheduled with `set_timeout` and `set_timeout_async` run immediately.
+"""
+import fnmatch
+import os
+import zipfile
+
+ROOT = None
+PLATFORM = "linux"
+SETTINGS = {}
+PANELS = []
+
+
+def configure(root, platform="linux"):
+    """Point the stand-in at an install created by `synthetic.make_install`."""
+
+    global ROOT
+    global PLATFORM
+    ROOT = root
+    PLATFORM = platform
+    SETTINGS.clear()
+    del PANELS[:]
+
+
+def platform():
+    """Get the platform."""
+
+    return PLATFORM
+
+
+def executable_path():
+    """Get the path of the executable."""
+
+    return os.path.join(ROOT, "App", "sublime_text")
+
+
+def installed_packages_path():
+    """Get the installed packages path."""
+
+    return os.path.join(ROOT, "Installed Packages")
+
+
+def packages_path():
+    """Get the packages path."""
+
+    return os.path.join(ROOT, "Packages")
+
+
+def cache_path():
+    """Get the cache path."""
+
+    return os.path.join(ROOT, "Cache")
+
+
+def default_packages_path():
+    """Get the default packages path."""
+
+    return os.path.join(ROOT, "App", "Packages")
+
+
+def archive_folders():
+    """Get the folders holding archives, highest priority first."""
+
+    return (installed_packages_path(), default_packages_path())
+
+
+def find_resources(pattern):
+    """Find active resources whose file name matches the pattern."""
+
+    found = {}
+    for folder in archive_folders()[::-1]:
+        for item in sorted(os.listdir(folder)):
+            if item.endswith(".sublime-package"):
+                pkg = item[:-len(".sublime-package")]
+                with zipfile.ZipFile(os.path.join(folder, item)) as z:
+                    for name in z.namelist():
+                        if not name.endswith("/"):
+                            found["Packages/%s/%s" % (pkg, name)] = None
+    base = packages_path()
+    for root, dirs, files in os.walk(base):
+        for f in files:
+            found["Packages/" + os.path.relpath(os.path.join(root, f), base).replace("\\", "/")] = None
+    return sorted(r for r in found if fnmatch.fnmatchcase(r.rsplit("/", 1)[-1], pattern))
+
+
+def load_binary_resource(resource):
+    """Load a resource's bytes, honouring overrides."""
+
+    parts = resource.split("/", 2)
+    loose = os.path.join(packages_path(), parts[1], os.path.normpath(parts[2]))
+    if os.path.exists(loose):
+        with open(loose, "rb") as f:
+            return f.read()
+    for folder in archive_folders():
+        pth = os.path.join(folder, "%s.sublime-package" % parts[1])
+        if os.path.exists(pth):
+            with zipfile.ZipFile(pth) as z:
+                try:
+                    return z.read(parts[2])
+                except KeyError:
+                    pass
+    raise IOError("resource not found")
+
+
+def load_resource(resource):
+    """Load a resource as text."""
+
+    return load_binary_resource(resource).decode("utf-8")
+
+
+def decode_value(text):
+    """Decode JSON."""
+
+    import json
+    return json.loads(text)
+
+
+class Settings(object):
+    """Settings object."""
+
+    def __init__(self):
+        """Setup the settings."""
+
+        self.values = {}
+
+    def get(self, key, default=None):
+        """Get a setting."""
+
+        return self.values.get(key, default)
+
+    def set(self, key, value):
+        """Set a setting."""
+
+        self.values[key] = value
+
+    def has(self, key):
+        """Check for a setting."""
+
+        return key in self.values
+
+    def erase(self, key):
+        """Erase a setting."""
+
+        self.values.pop(key, None)
+
+    def add_on_change(self, key, callback):
+        """Ignore change listeners."""
+
+    def clear_on_change(self, key):
+        """Ignore change listeners."""
+
+
+def load_settings(name):
+    """Load a settings object."""
+
+    return SETTINGS.setdefault(name, Settings())
+
+
+def set_timeout(callback, delay=0):
+    """Run the callback now."""
+
+    callback()
+
+
+def set_timeout_async(callback, delay=0):
+    """Run the callback now."""
+
+    callback()
+
+
+def status_message(msg):
+    """Ignore status messages."""
+
+
+def error_message(msg):
+    """Print error messages."""
+
+    print("error: %s" % msg)
+
+
+class Region(object):
+    """Region."""
+
+    def __init__(self, a, b=None):
+        """Setup the region."""
+
+        self.a = a
+        self.b = a if b is None else b
+
+
+class Window(object):
+    """Window that records the quick panels shown."""
+
+    def show_quick_panel(self, items, on_select, flags=0, selected_index=-1, on_highlight=None):
+        """Record the panel."""
+
+        PANELS.append(list(items))
+
+    def run_command(self, cmd, args=None):
+        """Ignore commands."""
+
+    def active_view(self):
+        """No views."""
+
+        return None
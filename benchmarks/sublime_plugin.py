@@ -0,0 +1,27 @@
+"""Stand-in for Sublime's `sublime_plugin` module."""
+
+
+class ApplicationCommand(object):
+    """Application command."""
+
+
+class WindowCommand(object):
+    """Window command."""
+
+    def __init__(self, window=None):
+        """Setup the command."""
+
+        self.window = window
+
+
+class TextCommand(object):
+    """Text command."""
+
+    def __init__(self, view=None):
+        """Setup the command."""
+
+        self.view = view
+
+
+class EventListener(object):
+    """Event listener."""
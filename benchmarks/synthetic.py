@@ -0,0 +1,101 @@
+"""
+Generate synthetic Sublime installs.
+
+The install has a `Default` archive with the maximum number of entries, a number of
+small installed archives, a few default archives and some unzipped packages (each with
+a `.git` folder) under `Packages`.  A few schemes are spread through all of them.
+"""
+import os
+import random
+import zipfile
+
+TMTHEME = b'''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>name</key>
+    <string>Synthetic</string>
+    <key>settings</key>
+    <array>
+        <dict>
+            <key>settings</key>
+            <dict>
+                <key>background</key>
+                <string>#272822</string>
+                <key>foreground</key>
+                <string>#F8F8F2</string>
+            </dict>
+        </dict>
+    </array>
+</dict>
+</plist>
+'''
+
+
+def entry_names(rand, count, prefix):
+    """Get entry names for a package, with a scheme every 50 entries."""
+
+    names = []
+    for i in range(count):
+        folder = "folder%02d/" % (i % 20) if i % 3 else ""
+        ext = ".tmTheme" if i % 50 == 0 else rand.choice((".py", ".sublime-syntax", ".sublime-settings", ".md"))
+        names.append("%s%s%05d%s" % (folder, prefix, i, ext))
+    return names
+
+
+def write_archive(pth, names):
+    """Write an archive with the given entries."""
+
+    with zipfile.ZipFile(pth, "w") as z:
+        for name in names:
+            z.writestr(name, TMTHEME if name.endswith(".tmTheme") else b"")
+
+
+def make_install(root, archives=100, max_entries=20000, folders=10, seed=0):
+    """Create the install under root and return a summary."""
+
+    rand = random.Random(seed)
+    installed = os.path.join(root, "Installed Packages")
+    default = os.path.join(root, "App", "Packages")
+    packages = os.path.join(root, "Packages")
+    for pth in (installed, default, os.path.join(packages, "User"), os.path.join(root, "Cache")):
+        os.makedirs(pth)
+
+    entries = 0
+    write_archive(os.path.join(default, "Default.sublime-package"), entry_names(rand, max_entries, "default"))
+    entries += max_entries
+    for i in range(max(archives // 10, 1)):
+        names = entry_names(rand, rand.randint(10, 200), "bundled")
+        write_archive(os.path.join(default, "Bundled%04d.sublime-package" % i), names)
+        entries += len(names)
+    for i in range(archives):
+        names = entry_names(rand, rand.randint(10, 200), "pkg")
+        write_archive(os.path.join(installed, "Package%04d.sublime-package" % i), names)
+        entries += len(names)
+
+    files = 0
+    for i in range(folders):
+        # Unzipped packages are often git clones of an installed package
+        base = os.path.join(packages, "Package%04d" % i)
+        for name in entry_names(rand, rand.randint(10, 200), "loose"):
+            pth = os.path.join(base, os.path.normpath(name))
+            if not os.path.exists(os.path.dirname(pth)):
+                os.makedirs(os.path.dirname(pth))
+            with open(pth, "wb") as f:
+                f.write(TMTHEME if name.endswith(".tmTheme") else b"")
+            files += 1
+        objects = os.path.join(base, ".git", "objects")
+        for j in range(100):
+            folder = os.path.join(objects, "%02x" % (j % 16))
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+            open(os.path.join(folder, "%038x" % j), "wb").close()
+            files += 1
+
+    # Age the install, as listings changed within the last couple of seconds are not cached
+    aged = os.stat(root).st_mtime - 60
+    for base, dirs, names in os.walk(root):
+        for name in dirs + names:
+            os.utime(os.path.join(base, name), (aged, aged))
+
+    return {"archives": archives + max(archives // 10, 1) + 1, "entries": entries, "files": files}
@@ -4,15 +4,52 @@ import sublime_plugin
 import sys
 import os
 import subprocess
-
-from .lib.package_search import PackageSearch
+import signal
+import threading
+import hashlib
+import json
+import zipfile
+
+from .lib.package_search import RESOURCE_INDEX, PackageSearch, find_resources
+from .lib.warm_editor import WarmEditor
+from .lib.temp_folder import Manifest, TempFolder, resource_source
+from .lib.log_tail import LogTail
+from .lib.live_reload import LiveReload
+from .lib.scheme_index import SchemeIndex
+from .lib.palette import PaletteCache, describe_palette, scheme_palette
+from .lib.color_scheme import parse_tmtheme, dump_tmtheme, tmtheme_to_color_scheme, dump_color_scheme
+from .lib.transform import load_spec, transform_tmtheme
+from .lib import batch
+from .lib.timing import INSTRUMENT
 
 TEMP_FOLDER = "SchemeEditorTemp"
 TEMP_PATH = "Packages/User/%s" % TEMP_FOLDER
+CONVERT_FOLDER = "SchemeEditorConverted"
+TRANSFORM_FOLDER = "SchemeEditorTransformed"
+TRANSFORM_PATH = "Packages/User/%s" % TRANSFORM_FOLDER
 PLUGIN_SETTINGS = 'scheme_editor.sublime-settings'
 PREFERENCES = 'Preferences.sublime-settings'
 SCHEME = "color_scheme"
 
+# Login shell environment probed once per session, keyed on `SHELL` and the editor setting
+ENV_CACHE = {}
+ENV_LOCK = threading.Lock()
+
+# Idle editor process kept ready when `warm_editor` is enabled
+STANDBY = WarmEditor()
+
+# Scopes, colors and font styles used by the installed schemes, created on first use
+SCHEME_INDEX = None
+
+# Palettes shown in the scheme picker, created on first use
+PALETTE_CACHE = None
+PALETTE_LOCK = threading.Lock()
+PALETTE_PENDING = set()
+
+# Live edit bridges keyed on the scheme file they reload
+BRIDGES = {}
+BRIDGE_LOCK = threading.Lock()
+
 
 MSGS = {
     "access": '''Scheme Editor:
@@ -36,20 +73,33 @@ else:
     _PLATFORM = "linux"
 
 
-def get_environ():
-    """Get environment and force utf-8."""
+def probe_environ(timeout):
+    """Get environment, with the login shell's `PATH`, and force utf-8."""
 
-    import os
     env = {}
     env.update(os.environ)
 
-    if _PLATFORM != 'windows':
-        shell = env['SHELL']
+    shell = env.get('SHELL')
+    if _PLATFORM != 'windows' and shell:
+        # Run the shell in its own process group, so anything its profile starts can be killed with it
         p = subprocess.Popen(
             [shell, '-l', '-c', 'echo "#@#@#${PATH}#@#@#"'],
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=True
         )
-        result = p.communicate()[0].decode('utf8').split('#@#@#')
+        try:
+            result = p.communicate(timeout=timeout)[0].decode('utf8').split('#@#@#')
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(p.pid, signal.SIGKILL)
+            except OSError:
+                p.kill()
+            # Don't wait on the pipes, a process that left the group may still hold them open
+            for pipe in (p.stdin, p.stdout, p.stderr):
+                pipe.close()
+            p.wait()
+            print("SchemeEditor: Login shell did not respond in %ss, using the current environment." % timeout)
+            result = []
         if len(result) > 1:
             bin_paths = result[1].split(':')
             if len(bin_paths):
@@ -62,6 +112,103 @@ def get_environ():
     return env
 
 
+def get_environ(refresh=False):
+    """
+    Get the editor's environment.
+
+    The login shell is only probed once per session for a given `SHELL` and editor setting.
+    The lock is not held while probing, so a slow shell never blocks other callers for longer
+    than their own probe.
+    """
+
+    p_settings = sublime.load_settings(PLUGIN_SETTINGS)
+    key = (os.environ.get('SHELL', ''), str(p_settings.get('editor', {}).get(sublime.platform())))
+    with ENV_LOCK:
+        env = None if refresh else ENV_CACHE.get(key)
+    if env is None:
+        with INSTRUMENT.phase("shell probe"):
+            env = probe_environ(float(p_settings.get('shell_timeout', 5)))
+        with ENV_LOCK:
+            ENV_CACHE[key] = env
+    return dict(env)
+
+
+def get_editor(p_settings):
+    """Get the command that calls the editor."""
+
+    return p_settings.get('editor', {}).get(sublime.platform(), ['python', '-m', 'subclrschm'])
+
+
+def prepare_standby():
+    """Start a standby editor if warm editing is enabled, otherwise stop any standby."""
+
+    p_settings = sublime.load_settings(PLUGIN_SETTINGS)
+    if bool(p_settings.get("warm_editor", False)):
+        STANDBY.spawn(get_editor(p_settings), get_environ())
+    else:
+        STANDBY.stop()
+
+
+def get_temp_folder():
+    """Get the temp folder of scheme copies."""
+
+    return TempFolder(os.path.join(sublime.packages_path(), "User", TEMP_FOLDER))
+
+
+def active_temp_copies():
+    """Get the names of temp copies in use as the color scheme."""
+
+    current_scheme = sublime.load_settings(PREFERENCES).get(SCHEME)
+    if current_scheme is not None and current_scheme.startswith(TEMP_PATH + "/"):
+        return set([current_scheme[len(TEMP_PATH) + 1:]])
+    return set()
+
+
+def evict_temp_copies(keep=()):
+    """Trim the temp folder to the configured budget, least recently used copies first."""
+
+    p_settings = sublime.load_settings(PLUGIN_SETTINGS)
+    get_temp_folder().evict(
+        active_temp_copies() | set(keep),
+        int(p_settings.get("temp_max_files", 50)),
+        int(float(p_settings.get("temp_max_size_mb", 20)) * 1024 * 1024)
+    )
+
+
+def live_reload_file(target, window):
+    """
+    Get the shadow file the editor should live edit in place of the scheme file.
+
+    A bridge already watching the scheme is reused, so an editor that is still open keeps
+    saving to the same shadow, but its shadow is seeded again if the scheme changed under it.
+    A new bridge applies saves an earlier one left in the shadow if the scheme has not changed since.
+    """
+
+    with BRIDGE_LOCK:
+        bridge = BRIDGES.get(target)
+        if bridge is None or not bridge.thread.is_alive():
+            shadow = os.path.join(
+                sublime.cache_path(), "SchemeEditor", "Live",
+                hashlib.sha1(target.encode('utf-8')).hexdigest()[:10], os.path.basename(target)
+            )
+            bridge = LiveReload(shadow, target, window)
+            bridge.start()
+            BRIDGES[target] = bridge
+        else:
+            bridge.refresh()
+    return bridge.shadow
+
+
+def stop_live_reload():
+    """Stop every bridge, applying the edits still pending."""
+
+    with BRIDGE_LOCK:
+        bridges = list(BRIDGES.values())
+        BRIDGES.clear()
+    for bridge in bridges:
+        bridge.stop()
+
+
 def load_resource(resource, binary=False):
     """Load the given resource."""
 
@@ -73,8 +220,25 @@ def load_resource(resource, binary=False):
     return bfr
 
 
-class SchemeEditorCommand(sublime_plugin.ApplicationCommand):
-    """Color scheme editor command."""
+class SchemeLaunch(object):
+    """
+    Launch the editor for one command run.
+
+    Loading and copying the scheme, probing the environment and starting the editor
+    run in stages on the async thread.  Only settings changes and error dialogs go back
+    to the main thread.  A launch can be cancelled between stages.
+    """
+
+    # The launch currently in flight
+    current = None
+
+    def __init__(self, action, select_theme, live_edit):
+        """Setup the launch."""
+
+        self.action = action
+        self.select_theme = select_theme
+        self.live_edit = live_edit
+        self.cancelled = False
 
     def init_settings(self, action, select_theme):
         """Initialize the settings."""
@@ -95,6 +259,16 @@ class SchemeEditorCommand(sublime_plugin.ApplicationCommand):
                 init_okay = False
         return init_okay
 
+    def set_scheme(self, scheme):
+        """Set the color scheme on the main thread."""
+
+        sublime.set_timeout(lambda: self.settings.set(SCHEME, scheme), 0)
+
+    def error(self, msg):
+        """Show an error dialog on the main thread."""
+
+        sublime.set_timeout(lambda: sublime.error_message(MSGS[msg]), 0)
+
     def prepare_theme(self, action):
         """Prepare the theme to be edited."""
 
@@ -109,25 +283,27 @@ class SchemeEditorCommand(sublime_plugin.ApplicationCommand):
                 not os.path.exists(self.actual_scheme_file) or
                 (not self.direct_edit and not self.scheme_file.startswith(TEMP_PATH))
             ):
-                # Create temp folder
-                zipped_themes = os.path.join(sublime.packages_path(), "User", TEMP_FOLDER)
-                if not os.path.exists(zipped_themes):
-                    os.makedirs(zipped_themes)
-
-                # Read theme file into memory and write out to the temp directory
-                text = load_resource(self.scheme_file, binary=True)
-                self.actual_scheme_file = os.path.join(zipped_themes, os.path.basename(self.scheme_file))
+                # Copy the theme to the temp folder, unless an identical copy is already there
+                temp = get_temp_folder()
                 try:
-                    with open(self.actual_scheme_file, "wb") as f:
-                        f.write(text)
+                    name = temp.extract(self.scheme_file, lambda resource: load_resource(resource, binary=True))
                 except:
-                    sublime.error_message(MSGS["temp"])
+                    # Never fall back to editing the package's own file
+                    self.actual_scheme_file = None
+                    self.cancelled = True
+                    self.error("temp")
                     return
+                self.actual_scheme_file = os.path.join(temp.folder, name)
+
+                # Keep the folder within budget
+                sublime.set_timeout_async(lambda: evict_temp_copies([name]), 0)
 
                 # Load unarchived theme
-                self.settings.set(SCHEME, "%s/%s" % (TEMP_PATH, os.path.basename(self.scheme_file)))
+                if not self.cancelled:
+                    self.set_scheme("%s/%s" % (TEMP_PATH, name))
             elif action == "select":
-                self.settings.set(SCHEME, self.scheme_file)
+                if not self.cancelled:
+                    self.set_scheme(self.scheme_file)
         elif action != "new" and action != "select":
             self.file_select = True
 
@@ -144,51 +320,255 @@ class SchemeEditorCommand(sublime_plugin.ApplicationCommand):
 
         return self.actual_scheme_file is not None and os.path.exists(self.actual_scheme_file)
 
-    def run(self, action=None, select_theme=None, live_edit=None):
-        """Run subclrschm."""
+    def start(self):
+        """Start the launch, cancelling any launch still in flight."""
 
         # Init settings.  Bail if returned an issue
-        if not self.init_settings(action, select_theme):
+        if not self.init_settings(self.action, self.select_theme):
             return
 
-        # Prepare the theme to be edited
-        # Copy to a temp location if desired before editing
-        self.prepare_theme(action)
+        if SchemeLaunch.current is not None:
+            SchemeLaunch.current.cancel()
+        SchemeLaunch.current = self
+        sublime.set_timeout_async(self.launch, 0)
+
+    def cancel(self):
+        """Cancel the launch before its next stage."""
+
+        self.cancelled = True
+        sublime.status_message("SchemeEditor: Launch cancelled")
+
+    def stage(self, msg):
+        """Report the next stage and return whether the launch should continue."""
+
+        if not self.cancelled:
+            sublime.status_message("SchemeEditor: %s..." % msg)
+        return not self.cancelled
+
+    def launch(self):
+        """Run the launch stages."""
+
+        try:
+            with INSTRUMENT.phase("launch"):
+                # Prepare the theme to be edited
+                # Copy to a temp location if desired before editing
+                if not self.stage("Preparing scheme"):
+                    return
+                with INSTRUMENT.phase("prepare_theme"):
+                    self.prepare_theme(self.action)
+
+                if not self.stage("Loading environment"):
+                    return
+                with INSTRUMENT.phase("environment"):
+                    env = get_environ()
+
+                if not self.stage("Starting editor"):
+                    return
+                self.launch_editor(env)
+        finally:
+            if SchemeLaunch.current is self:
+                SchemeLaunch.current = None
+
+    def launch_editor(self, env):
+        """Call the editor with the theme file."""
 
-        # Call the editor with the theme file
         try:
-            cmd = (
-                self.p_settings.get('editor', {}).get(sublime.platform(), ['python', '-m', 'subclrschm']) +
+            editor = get_editor(self.p_settings)
+            live_edit = self.is_live_edit(self.live_edit)
+            scheme_file = self.actual_scheme_file if self.is_actual_scheme_file() else None
+            window = float(self.p_settings.get("live_reload_window", 250)) / 1000.0
+            if scheme_file is not None and live_edit and window > 0:
+                # Let the editor save as often as it likes; Sublime reloads at most once per window
+                scheme_file = live_reload_file(scheme_file, window)
+            args = (
                 (["--debug"] if bool(self.p_settings.get("debug", False)) else []) +
-                (["-n"] if action == "new" else []) +
+                (["--multi-instance"] if bool(self.p_settings.get("multiple_instances", False)) else []) +
+                (["-n"] if self.action == "new" else []) +
                 (["-s"] if self.file_select else []) +
-                (["-L"] if self.is_live_edit(live_edit) else []) +
+                (["-L"] if live_edit else []) +
                 ["-l", os.path.join(sublime.packages_path(), "User")] +
-                ([self.actual_scheme_file] if self.is_actual_scheme_file() else [])
-            )
-            print(cmd)
-            subprocess.Popen(
-                cmd,
-                env=get_environ()
+                ([scheme_file] if scheme_file is not None else [])
             )
+            print(editor + args)
+            warm = bool(self.p_settings.get("warm_editor", False))
+            with INSTRUMENT.phase("popen"):
+                if not (warm and STANDBY.launch(editor, args)):
+                    subprocess.Popen(
+                        editor + args,
+                        env=env
+                    )
+                else:
+                    INSTRUMENT.count("standby launches")
+            sublime.status_message("SchemeEditor: Editor started")
+            if warm:
+                # Get the next standby ready
+                prepare_standby()
         except Exception as e:
             print("SchemeEditor: " + str(e))
-            sublime.error_message(MSGS["access"])
+            self.error("access")
+
+
+class SchemeEditorCommand(sublime_plugin.ApplicationCommand):
+    """Color scheme editor command."""
+
+    def run(self, action=None, select_theme=None, live_edit=None):
+        """Run subclrschm."""
+
+        SchemeLaunch(action, select_theme, live_edit).start()
+
+
+class SchemeEditorCancelLaunchCommand(sublime_plugin.ApplicationCommand):
+    """Cancel the editor launch in flight."""
+
+    def run(self):
+        """Run the command."""
+
+        if SchemeLaunch.current is not None:
+            SchemeLaunch.current.cancel()
+
+    def is_enabled(self):
+        """Check if a launch is in flight."""
+
+        return SchemeLaunch.current is not None
+
+
+class SchemeEditorRefreshEnvironmentCommand(sublime_plugin.ApplicationCommand):
+    """Re-probe the login shell environment used to launch the editor."""
+
+    def run(self):
+        """Run the command."""
+
+        def refresh():
+            get_environ(refresh=True)
+            sublime.status_message("SchemeEditor: Environment refreshed")
+
+        sublime.set_timeout_async(refresh, 0)
+
+
+def get_palette_cache():
+    """Get the cache of scheme palettes."""
+
+    global PALETTE_CACHE
+    if PALETTE_CACHE is None:
+        PALETTE_CACHE = PaletteCache(os.path.join(sublime.cache_path(), "SchemeEditor", "palettes.json"))
+    return PALETTE_CACHE
+
+
+def palette_source(resource):
+    """Get the `[path, mtime]` of the file a resource is read from."""
+
+    source = resource_source(resource)
+    return source[:2] if source is not None else None
+
+
+def resource_palette_location(resource):
+    """Get the `[path, mtime]` of the file a resource is read from and a loader of its bytes."""
+
+    return palette_source(resource), lambda: load_resource(resource, binary=True)
+
+
+def file_palette_location(pth, name=None):
+    """
+    Get the `[path, mtime]` of a scheme file and a loader of its bytes.
+
+    With `name`, the scheme is the file of that name within the archive at `pth`.
+    """
+
+    def load():
+        if name is None:
+            with open(pth, 'rb') as f:
+                return f.read()
+        with zipfile.ZipFile(pth) as z:
+            return z.read(name)
+
+    sig = RESOURCE_INDEX.signature(pth)
+    return [pth, sig[0]] if sig is not None else None, load
+
+
+def extract_palettes(missing):
+    """Work out and cache the palettes of `(scheme, source, loader)` entries, one at a time, off the main thread."""
+
+    entries = []
+    for resource, source, loader in missing:
+        try:
+            entries.append((resource, source, scheme_palette(resource, loader(), sublime.decode_value)))
+        except Exception as e:
+            print("SchemeEditor: Could not read the palette of %s: %s" % (resource, str(e)))
+    if entries:
+        get_palette_cache().update(entries)
+    with PALETTE_LOCK:
+        PALETTE_PENDING.difference_update(m[0] for m in missing)
+
+
+def palette_annotations(resources, locate=resource_palette_location):
+    """
+    Get the cached palette description of each scheme, or an empty string.
+
+    `locate(scheme)` gets the `[path, mtime]` a scheme is read from and a loader of its bytes.
+    Schemes without a cached palette are queued for the background worker,
+    so they are described the next time the picker is shown.
+    """
+
+    cache = get_palette_cache()
+    annotations = []
+    missing = []
+    for resource in resources:
+        source, loader = locate(resource)
+        palette = cache.get(resource, source) if source is not None else None
+        if palette is None:
+            missing.append((resource, source, loader))
+        annotations.append(describe_palette(palette) if palette is not None else "")
+    with PALETTE_LOCK:
+        missing = [m for m in missing if m[0] not in PALETTE_PENDING]
+        PALETTE_PENDING.update(m[0] for m in missing)
+    if missing:
+        sublime.set_timeout_async(lambda: extract_palettes(missing), 0)
+    return annotations
 
 
 class SchemeEditorGetSchemeCommand(sublime_plugin.WindowCommand, PackageSearch):
     """Get color scheme files."""
 
     def on_select(self, value, settings):
-        """Process selected menu item."""
+        """Preview the highlighted scheme once the highlight settles."""
 
         if value != -1:
-            preferences = sublime.load_settings(PREFERENCES)
-            preferences.set(SCHEME, settings[value])
+            self.preview_id += 1
+            preview_id = self.preview_id
+            scheme = settings[value]
+            sublime.set_timeout(lambda: self.preview(preview_id, scheme), self.preview_delay)
+
+    def preview(self, preview_id, scheme):
+        """Apply the preview unless another scheme was highlighted since."""
+
+        if preview_id != self.preview_id:
+            return
+        if self.preview_view is not None:
+            self.preview_view.settings().set(SCHEME, scheme)
+        else:
+            sublime.load_settings(PREFERENCES).set(SCHEME, scheme)
+        self.previewed = True
+
+    def restore_preview(self):
+        """
+        Drop any pending preview and undo a preview in the active view.
+
+        Returns whether a preview changed the color scheme preference.
+        """
+
+        self.preview_id += 1
+        if self.previewed and self.preview_view is not None:
+            view_settings = self.preview_view.settings()
+            view_settings.erase(SCHEME)
+            if view_settings.get(SCHEME) != self.view_color_scheme:
+                view_settings.set(SCHEME, self.view_color_scheme)
+            return False
+        return self.previewed
 
     def process_file(self, value, settings):
         """Process the file."""
 
+        previewed = self.restore_preview()
         if value != -1:
             if self.edit:
                 sublime.run_command(
@@ -199,15 +579,53 @@ class SchemeEditorGetSchemeCommand(sublime_plugin.WindowCommand, PackageSearch):
                 preferences = sublime.load_settings(PREFERENCES)
                 preferences.set(SCHEME, settings[value])
         else:
-            if self.current_color_scheme is not None:
+            if self.current_color_scheme is not None and previewed:
                 preferences = sublime.load_settings(PREFERENCES)
                 preferences.set(SCHEME, self.current_color_scheme)
 
+    def panel_items(self, resources):
+        """Annotate each scheme with its palette."""
+
+        if not self.palettes:
+            return resources
+        with INSTRUMENT.phase("palette annotations"):
+            return [[resource, annotation] for resource, annotation in zip(resources, palette_annotations(resources))]
+
+    def raw_items(self, settings):
+        """Annotate each hit with the palette of the file it was found in."""
+
+        if not self.palettes:
+            return settings
+        keys = []
+        locations = {}
+        for item in settings:
+            pth, name = self.raw_location(item)
+            # Overridden copies of a scheme are told apart by the file they are read from
+            key = pth if name is None else "%s/%s" % (pth, name)
+            keys.append(key)
+            locations[key] = (pth, name)
+        with INSTRUMENT.phase("palette annotations"):
+            annotations = palette_annotations(keys, lambda key: file_palette_location(*locations[key]))
+        return [item[:2] + [annotation] for item, annotation in zip(settings, annotations)]
+
     def pre_process(self, **kwargs):
         """Pre-process actions."""
 
         self.edit = kwargs.get("edit", True)
+        p_settings = sublime.load_settings(PLUGIN_SETTINGS)
+        self.search_workers = int(p_settings.get("search_workers", 1))
+        self.stream_results = bool(p_settings.get("stream_results", True))
+        self.stream_interval = int(p_settings.get("stream_interval", 250)) / 1000.0
+        self.palettes = bool(p_settings.get("show_palettes", True))
         self.current_color_scheme = sublime.load_settings("Preferences.sublime-settings").get("color_scheme")
+
+        # Previews are debounced so only the scheme the highlight settles on is applied
+        self.preview_id = 0
+        self.previewed = False
+        self.preview_delay = int(p_settings.get("preview_delay", 150))
+        self.preview_view = self.window.active_view() if p_settings.get("preview_active_view_only", False) else None
+        if self.preview_view is not None:
+            self.view_color_scheme = self.preview_view.settings().get(SCHEME)
         return {"pattern": "*.tmTheme"}
 
     def run(self, **kwargs):
@@ -216,15 +634,152 @@ class SchemeEditorGetSchemeCommand(sublime_plugin.WindowCommand, PackageSearch):
         self.search(**kwargs)
 
 
+def get_scheme_index():
+    """Get the index of what the installed schemes use."""
+
+    global SCHEME_INDEX
+    if SCHEME_INDEX is None:
+        SCHEME_INDEX = SchemeIndex(os.path.join(sublime.cache_path(), "SchemeEditor", "scheme_index.json"))
+    return SCHEME_INDEX
+
+
+class SchemeEditorFindSchemesCommand(SchemeEditorGetSchemeCommand):
+    """Find the schemes that use a scope, color or font style and pick one of them."""
+
+    def run(self, query=None, **kwargs):
+        """Run the command."""
+
+        if query:
+            self.search(query=query, **kwargs)
+        else:
+            self.window.show_input_panel(
+                "Find schemes using (scope, #color or font style):", "",
+                lambda text: self.search(query=text, **kwargs), None, None
+            )
+
+    def pre_process(self, **kwargs):
+        """Pre-process actions."""
+
+        super(SchemeEditorFindSchemesCommand, self).pre_process(**kwargs)
+        # Both kinds are always indexed, so editing and selecting do not drop each other's entries
+        return {"pattern": ["*.tmTheme", "*.sublime-color-scheme"]}
+
+    def find(self, pattern, regex):
+        """Update the index in the background, then show the schemes that match the query."""
+
+        sublime.status_message("SchemeEditor: Indexing schemes...")
+        sublime.set_timeout_async(lambda: self.query(pattern), 0)
+
+    def query(self, pattern):
+        """Query the index."""
+
+        resources = [
+            resource for resource, matched in find_resources(pattern)
+            if not resource.startswith(TEMP_PATH + "/")
+        ]
+        index = get_scheme_index()
+        with INSTRUMENT.phase("scheme index"):
+            index.update(
+                resources, resource_source, lambda resource: load_resource(resource, binary=True),
+                sublime.decode_value
+            )
+        found = index.query(self.query_text)
+        if self.edit:
+            # The editor only opens tmThemes
+            found = [f for f in found if f[0].lower().endswith(".tmtheme")]
+        sublime.set_timeout(lambda: self.show(found), 0)
+
+    def show(self, found):
+        """Show the matching schemes."""
+
+        if not found:
+            sublime.status_message("SchemeEditor: No schemes use %s" % self.query_text)
+            return
+        sublime.status_message("SchemeEditor: %d schemes use %s" % (len(found), self.query_text))
+        resources = [f[0] for f in found]
+        self.window.show_quick_panel(
+            [[f[0], ", ".join(f[1])] for f in found],
+            lambda x: self.process_file(x, settings=resources),
+            0,
+            0,
+            lambda x: self.on_select(x, settings=resources)
+        )
+
+    def search(self, query="", **kwargs):
+        """Search the index."""
+
+        self.query_text = query.strip()
+        if self.query_text:
+            kwargs["find_all"] = False
+            super(SchemeEditorFindSchemesCommand, self).search(**kwargs)
+
+
 class SchemeEditorLogCommand(sublime_plugin.WindowCommand):
     """Color scheme editor log command."""
 
-    def run(self):
+    def run(self, level=None):
         """Run the command."""
 
         log = os.path.join(sublime.packages_path(), "User", "subclrschm.log")
-        if os.path.exists(log):
-            self.window.open_file(log)
+        if not os.path.exists(log):
+            return
+
+        for view in self.window.views():
+            if view.settings().get("scheme_editor_log") == (level or ""):
+                self.window.focus_view(view)
+                return
+
+        p_settings = sublime.load_settings(PLUGIN_SETTINGS)
+        view = self.window.new_file()
+        view.set_name("subclrschm.log" if not level else "subclrschm.log (%s)" % level.upper())
+        view.set_scratch(True)
+        view.set_read_only(True)
+        view.settings().set("scheme_editor_log", level or "")
+        view.settings().set("word_wrap", False)
+        tail = LogTail(log, int(p_settings.get("log_tail_kb", 256)) * 1024, level)
+        interval = int(p_settings.get("log_poll_interval", 500))
+        sublime.set_timeout_async(lambda: self.follow(view, tail, interval), 0)
+
+    def follow(self, view, tail, interval):
+        """Add new log lines to the view until it is closed."""
+
+        if view.window() is None:
+            return
+        text, reset = tail.read()
+        if text or reset:
+            view.run_command(
+                "scheme_editor_log_append",
+                {"text": text, "reset": reset, "max_size": tail.tail_bytes * 2}
+            )
+        sublime.set_timeout_async(lambda: self.follow(view, tail, interval), interval)
+
+
+class SchemeEditorLogAppendCommand(sublime_plugin.TextCommand):
+    """Add text to the end of the log view."""
+
+    def run(self, edit, text, reset=False, max_size=0):
+        """Run the command."""
+
+        view = self.view
+        view.set_read_only(False)
+        at_end = view.sel()[0].b == view.size() if len(view.sel()) else True
+        if reset:
+            view.erase(edit, sublime.Region(0, view.size()))
+        view.insert(edit, view.size(), text)
+        if max_size and view.size() > max_size:
+            # Keep the view bounded, dropping whole lines from the top
+            cut = min(view.line(view.size() - max_size).end() + 1, view.size())
+            view.erase(edit, sublime.Region(0, cut))
+        view.set_read_only(True)
+        if at_end:
+            view.sel().clear()
+            view.sel().add(sublime.Region(view.size()))
+            view.show(view.size())
+
+    def is_visible(self):
+        """Hide from menus."""
+
+        return False
 
 
 class SchemeEditorClearTempCommand(sublime_plugin.ApplicationCommand):
@@ -233,23 +788,145 @@ class SchemeEditorClearTempCommand(sublime_plugin.ApplicationCommand):
     def run(self):
         """Run the command."""
 
-        current_scheme = sublime.load_settings(PREFERENCES).get(SCHEME)
-        using_temp = current_scheme.startswith(TEMP_PATH)
-        folder = os.path.join(sublime.packages_path(), "User", TEMP_FOLDER)
-        for f in os.listdir(folder):
-            pth = os.path.join(folder, f)
-            try:
-                if (
-                    os.path.isfile(pth) and
-                    (
-                        not using_temp or (
-                            os.path.basename(pth) != os.path.basename(current_scheme)
-                        )
-                    )
-                ):
-                    os.unlink(pth)
-            except:
-                print("SchemeEditor: Could not remove %s!" % pth)
+        get_temp_folder().purge(active_temp_copies())
+
+
+class SchemeEditorTimingReportCommand(sublime_plugin.WindowCommand):
+    """Show the recorded hot path timings and counts."""
+
+    def run(self, reset=False):
+        """Run the command."""
+
+        report = INSTRUMENT.report()
+        view = self.window.new_file()
+        view.set_name("SchemeEditor Timings")
+        view.set_scratch(True)
+        view.run_command("scheme_editor_log_append", {"text": json.dumps(report, indent=4) + "\n"})
+        if reset:
+            INSTRUMENT.reset()
+
+
+class SchemeEditorConvertSchemesCommand(sublime_plugin.ApplicationCommand):
+    """Convert every installed tmTheme to a sublime-color-scheme in the User package."""
+
+    def run(self):
+        """Run the command."""
+
+        sublime.status_message("SchemeEditor: Converting schemes...")
+        sublime.set_timeout_async(self.convert, 0)
+
+    def convert(self):
+        """Convert the schemes on a thread pool, skipping the ones already converted."""
+
+        folder = os.path.join(sublime.packages_path(), "User", CONVERT_FOLDER)
+        resources = [
+            resource for resource, pattern in find_resources("*.tmTheme")
+            if not resource.startswith(TEMP_PATH + "/")
+        ]
+        manifest = Manifest(folder)
+        converted = manifest.load()
+        workers = int(sublime.load_settings(PLUGIN_SETTINGS).get("batch_workers", 1))
+
+        stats, results = batch.run_batch(
+            resources, lambda resource: self.convert_scheme(folder, converted, resource), workers
+        )
+        for resource, status, result in results:
+            if status == batch.DONE:
+                converted[result[0]] = result[1]
+        manifest.save(converted)
+
+        report = stats.report("converted")
+        print("SchemeEditor: Schemes %s" % report)
+        sublime.status_message("SchemeEditor: Schemes %s" % report)
+
+    def convert_scheme(self, folder, converted, resource):
+        """
+        Convert one scheme to `<folder>/<package>/<path>/<name> (Converted).sublime-color-scheme`.
+
+        Sublime merges color schemes that share a file name, so a converted scheme
+        keeping its source's name would change the look of the scheme it came from.
+        """
+
+        data = load_resource(resource, binary=True)
+        digest = hashlib.sha1(data).hexdigest()
+        name = "%s (Converted).sublime-color-scheme" % os.path.splitext(resource[len("Packages/"):])[0]
+        target = os.path.join(folder, os.path.normpath(name))
+        if converted.get(name) == digest and os.path.exists(target):
+            return batch.SKIPPED, len(data), None
+
+        text = dump_color_scheme(tmtheme_to_color_scheme(parse_tmtheme(data)))
+        if not os.path.exists(os.path.dirname(target)):
+            os.makedirs(os.path.dirname(target))
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(text)
+        return batch.DONE, len(data), (name, digest)
+
+
+class SchemeEditorTransformSchemesCommand(sublime_plugin.ApplicationCommand):
+    """Apply a transform spec to many schemes without opening the editor."""
+
+    def run(self, spec=None, pattern="*.tmTheme", regex=False):
+        """Run the command."""
+
+        if spec is None:
+            spec = sublime.load_settings(PLUGIN_SETTINGS).get("transform_spec", [])
+        try:
+            operations = load_spec(spec)
+        except Exception as e:
+            sublime.error_message("Scheme Editor:\nInvalid transform spec: %s" % str(e))
+            return
+        if not operations:
+            sublime.error_message("Scheme Editor:\nThe transform spec has no operations.")
+            return
+        sublime.status_message("SchemeEditor: Transforming schemes...")
+        sublime.set_timeout_async(lambda: self.transform(operations, pattern, regex), 0)
+
+    def transform(self, operations, pattern, regex):
+        """
+        Transform the schemes on a thread pool, then store the copies and reload once.
+
+        The copies get their own folder, so the temp folder's budget never removes them.
+        """
+
+        resources = [
+            resource for resource, matched in find_resources(pattern, regex)
+            if (
+                resource.endswith(".tmTheme") and
+                not resource.startswith(TEMP_PATH + "/") and not resource.startswith(TRANSFORM_PATH + "/")
+            )
+        ]
+        workers = int(sublime.load_settings(PLUGIN_SETTINGS).get("batch_workers", 1))
+
+        stats, results = batch.run_batch(
+            resources, lambda resource: self.transform_scheme(operations, resource), workers
+        )
+        contents = [(resource, result) for resource, status, result in results if status == batch.DONE]
+        folder = TempFolder(os.path.join(sublime.packages_path(), "User", TRANSFORM_FOLDER))
+        copies = dict(
+            (resource, name) for (resource, data), (name, written) in zip(contents, folder.write(contents))
+        )
+        sublime.set_timeout(lambda: self.reload(copies), 0)
+
+        report = stats.report("transformed")
+        print("SchemeEditor: Schemes %s" % report)
+        sublime.status_message("SchemeEditor: Schemes %s" % report)
+
+    def transform_scheme(self, operations, resource):
+        """Transform one scheme and get the new bytes."""
+
+        data = load_resource(resource, binary=True)
+        theme = parse_tmtheme(data)
+        if not transform_tmtheme(theme, operations):
+            return batch.SKIPPED, len(data), None
+        return batch.DONE, len(data), dump_tmtheme(theme)
+
+    def reload(self, copies):
+        """Switch to the transformed copy of the current scheme, if it was transformed."""
+
+        preferences = sublime.load_settings(PREFERENCES)
+        name = copies.get(preferences.get(SCHEME))
+        if name is not None:
+            preferences.set(SCHEME, "%s/%s" % (TRANSFORM_PATH, name))
 
 
 def delete_old_binary():
@@ -311,6 +988,10 @@ def init_plugin():
     """Init the plugin."""
 
     delete_old_binary()
+    INSTRUMENT.enabled = bool(sublime.load_settings(PLUGIN_SETTINGS).get("instrumentation", False))
+    # Probe the login shell environment in the background so launching the editor doesn't wait on it
+    sublime.set_timeout_async(get_environ, 0)
+    sublime.set_timeout_async(prepare_standby, 0)
     p_settings = sublime.load_settings(PLUGIN_SETTINGS)
     p_settings.clear_on_change('reload')
     p_settings.add_on_change('reload', init_plugin)
@@ -320,3 +1001,10 @@ def plugin_loaded():
     """Load the plugin."""
 
     sublime.set_timeout(init_plugin, 3000)
+
+
+def plugin_unloaded():
+    """Unload the plugin."""
+
+    STANDBY.stop()
+    stop_live_reload()
@@ -0,0 +1,73 @@
+"""
+Batch jobs over many schemes.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+__all__ = ("DONE", "SKIPPED", "FAILED", "BatchStats", "run_batch")
+
+DONE = "done"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+class BatchStats(object):
+    """Counts and throughput of a batch run."""
+
+    def __init__(self):
+        """Setup the counters."""
+
+        self.counts = {DONE: 0, SKIPPED: 0, FAILED: 0}
+        self.bytes = 0
+        self.elapsed = 0.0
+
+    def add(self, status, size):
+        """Count a finished item."""
+
+        self.counts[status] += 1
+        self.bytes += size
+
+    def report(self, verb="processed"):
+        """Get a one line summary."""
+
+        files = sum(self.counts.values())
+        elapsed = self.elapsed or 1e-9
+        return "%d %s, %d current, %d failed in %.2fs (%.1f files/s, %.1f KB/s)" % (
+            self.counts[DONE], verb, self.counts[SKIPPED], self.counts[FAILED], self.elapsed,
+            files / elapsed, self.bytes / 1024.0 / elapsed
+        )
+
+
+def run_batch(items, func, workers=1):
+    """
+    Run `func` over the items on a bounded thread pool.
+
+    `func` returns `(status, bytes read, result)`.  An item that raises counts as failed.
+    Returns the stats and each item's `(item, status, result)` in item order.
+    """
+
+    def job(item):
+        try:
+            return func(item)
+        except Exception as e:
+            print("SchemeEditor: Failed to process %s: %s" % (item, str(e)))
+            return FAILED, 0, None
+
+    stats = BatchStats()
+    start = time.time()
+    workers = min(max(int(workers), 1), max(len(items), 1))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            outcomes = list(pool.map(job, items))
+    else:
+        outcomes = [job(item) for item in items]
+    stats.elapsed = time.time() - start
+
+    results = []
+    for item, (status, size, result) in zip(items, outcomes):
+        stats.add(status, size)
+        results.append((item, status, result))
+    return stats, results
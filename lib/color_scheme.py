@@ -0,0 +1,111 @@
+"""
+Color scheme data.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import json
+import plistlib
+import re
+from collections import OrderedDict
+
+__all__ = (
+    "parse_tmtheme",
+    "dump_tmtheme",
+    "tmtheme_to_color_scheme",
+    "load_scheme",
+    "resolve_variable",
+    "dump_color_scheme"
+)
+
+RE_CAMEL = re.compile(r'(?<=[a-z0-9])([A-Z])')
+RE_VARIABLE = re.compile(r'^var\(\s*([^\s)]+)\s*\)$')
+
+
+def snake_case(name):
+    """Convert a tmTheme `camelCase` key to a sublime-color-scheme `snake_case` key."""
+
+    return RE_CAMEL.sub(r'_\1', name).lower()
+
+
+def parse_tmtheme(data):
+    """Parse tmTheme bytes."""
+
+    loads = getattr(plistlib, 'loads', None)
+    if loads is None:
+        # Python 3.3
+        loads = plistlib.readPlistFromBytes
+    return loads(data)
+
+
+def dump_tmtheme(theme):
+    """Serialize a tmTheme to bytes."""
+
+    dumps = getattr(plistlib, 'dumps', None)
+    if dumps is None:
+        # Python 3.3
+        dumps = plistlib.writePlistToBytes
+    return dumps(theme)
+
+
+def tmtheme_to_color_scheme(theme):
+    """
+    Convert a parsed tmTheme to a sublime-color-scheme object.
+
+    The first settings entry without a scope holds the globals.  Every other entry becomes
+    a rule.  Setting names are converted to `snake_case`, so `lineHighlight` becomes
+    `line_highlight` and `fontStyle` becomes `font_style`.
+    """
+
+    scheme = OrderedDict()
+    scheme["name"] = theme.get("name", "")
+    if theme.get("author"):
+        scheme["author"] = theme["author"]
+    scheme["variables"] = OrderedDict()
+    scheme["globals"] = OrderedDict()
+    scheme["rules"] = []
+
+    found_globals = False
+    for entry in theme.get("settings", []):
+        settings = entry.get("settings", {})
+        if "scope" not in entry and not found_globals:
+            found_globals = True
+            for key, value in settings.items():
+                scheme["globals"][snake_case(key)] = value
+            continue
+
+        rule = OrderedDict()
+        if entry.get("name"):
+            rule["name"] = entry["name"]
+        rule["scope"] = entry.get("scope", "")
+        for key, value in settings.items():
+            rule[snake_case(key)] = value
+        scheme["rules"].append(rule)
+    return scheme
+
+
+def load_scheme(resource, data, decode=json.loads):
+    """
+    Load a tmTheme or sublime-color-scheme resource as a sublime-color-scheme object.
+
+    `decode` parses sublime-color-scheme text.
+    """
+
+    if resource.endswith(".tmTheme"):
+        return tmtheme_to_color_scheme(parse_tmtheme(data))
+    return decode(data.decode('utf-8'))
+
+
+def resolve_variable(scheme, value):
+    """Get the value a `var(name)` setting refers to, or the value itself."""
+
+    m = RE_VARIABLE.match(value) if isinstance(value, str) else None
+    if m is not None:
+        return scheme.get("variables", {}).get(m.group(1), value)
+    return value
+
+
+def dump_color_scheme(scheme):
+    """Serialize a sublime-color-scheme object."""
+
+    return json.dumps(scheme, indent=4, ensure_ascii=False) + '\n'
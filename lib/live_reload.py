@@ -0,0 +1,196 @@
+"""
+Throttled hand off of live edits to the color scheme Sublime loads.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import hashlib
+import os
+import threading
+import time
+from .timing import INSTRUMENT
+
+__all__ = ("LiveReload",)
+
+# Seconds within which two saves may share a modification time
+MTIME_RESOLUTION = 2.0
+
+
+def signature(pth):
+    """Get the mtime and size of a file or `None`."""
+
+    try:
+        st = os.stat(pth)
+    except OSError:
+        return None
+    return (st.st_mtime, st.st_size)
+
+
+class LiveReload(object):
+    """
+    Copy a shadow file the editor saves to over the scheme Sublime loads, at most once per window.
+
+    With live editing the editor rewrites the whole scheme on every change, and Sublime reloads
+    the scheme and repaints every view each time.  The editor is given the shadow file instead,
+    which lives outside of the packages Sublime watches.  The shadow is checked once per window,
+    and if it changed, its content replaces the scheme in one atomic swap, so a burst of saves
+    costs a single reload.  The editor may save to the shadow at any time while it is open, so the
+    bridge runs until it is stopped, but once the shadow has been left alone for `idle` seconds it
+    is only checked every `idle_window` seconds.
+
+    The hash of the scheme content last written or seeded is recorded next to the shadow, so a
+    scheme changed by something other than the bridge is never overwritten with an older shadow.
+    """
+
+    def __init__(self, shadow, target, window=0.25, idle=30.0, idle_window=2.0):
+        """Setup the bridge."""
+
+        self.shadow = shadow
+        self.target = target
+        self.window = max(float(window), 0.01)
+        self.idle = float(idle)
+        self.idle_window = max(float(idle_window), self.window)
+        self.event = threading.Event()
+        self.lock = threading.Lock()
+        self.record = shadow + '.target'
+        self.thread = None
+        self.reloads = 0
+        self.latency = 0.0
+        self.max_latency = 0.0
+        self.applied = None
+        self.data = None
+
+    def recorded(self):
+        """Get the hash of the scheme content the bridge last wrote or seeded, or `None`."""
+
+        try:
+            with open(self.record, 'r') as f:
+                return f.read().strip()
+        except Exception:
+            return None
+
+    def remember(self, data):
+        """Record the scheme content the bridge wrote or seeded."""
+
+        with open(self.record, 'w') as f:
+            f.write(hashlib.sha1(data).hexdigest())
+
+    def seed(self, data):
+        """Replace the shadow with the scheme's content."""
+
+        tmp = self.shadow + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, self.shadow)
+        self.data = data
+        self.applied = signature(self.shadow)
+        self.remember(data)
+
+    def start(self):
+        """
+        Seed the shadow with the scheme and start watching it.
+
+        A shadow left by an earlier bridge may hold saves that were never applied.  They are only
+        applied if the scheme still holds what that bridge last wrote, otherwise the scheme changed
+        since and the shadow is seeded from it again.
+        """
+
+        folder = os.path.dirname(self.shadow)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        with open(self.target, 'rb') as f:
+            data = f.read()
+        if os.path.exists(self.shadow) and self.recorded() == hashlib.sha1(data).hexdigest():
+            self.data = data
+            self.applied = None
+            self.apply()
+        else:
+            self.seed(data)
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def refresh(self):
+        """Seed the shadow again if the scheme was changed by something other than the bridge."""
+
+        with self.lock:
+            with open(self.target, 'rb') as f:
+                data = f.read()
+            if data != self.data:
+                self.seed(data)
+
+    def stop(self):
+        """Stop watching after applying any pending change."""
+
+        self.event.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+
+    def run(self):
+        """Apply changes once per window until stopped, checking less often while idle."""
+
+        last_change = time.time()
+        while not self.event.wait(self.window if time.time() - last_change <= self.idle else self.idle_window):
+            if self.apply():
+                last_change = time.time()
+        self.apply()
+        if self.reloads:
+            print("SchemeEditor: %s" % self.report())
+
+    def apply(self):
+        """Swap the shadow's content into the scheme if it changed, returning whether it was applied."""
+
+        with self.lock:
+            return self.swap()
+
+    def swap(self):
+        """Swap the shadow's content into the scheme if it changed."""
+
+        sig = signature(self.shadow)
+        # A file system with coarse timestamps can hide a save made within the same tick,
+        # so a recently modified shadow is compared by content as well.
+        if sig is None or (sig == self.applied and time.time() - sig[0] > MTIME_RESOLUTION):
+            return False
+        try:
+            with open(self.shadow, 'rb') as f:
+                data = f.read()
+        except Exception:
+            return False
+        if signature(self.shadow) != sig:
+            # The editor is still writing, try again next window
+            return False
+        if data == self.data:
+            self.applied = sig
+            return False
+
+        tmp = self.target + '.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self.target)
+        except Exception as e:
+            print("SchemeEditor: Could not reload %s: %s" % (self.target, str(e)))
+            return False
+        self.applied = sig
+        self.data = data
+        try:
+            self.remember(data)
+        except Exception as e:
+            print("SchemeEditor: Could not record the reload of %s: %s" % (self.target, str(e)))
+
+        latency = max(time.time() - sig[0], 0.0)
+        self.reloads += 1
+        self.latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        INSTRUMENT.count("live reloads")
+        if INSTRUMENT.enabled:
+            INSTRUMENT.record("live reload latency", latency)
+        return True
+
+    def report(self):
+        """Get a one line summary of the reloads."""
+
+        return "%d live reloads of %s, %.0f ms average and %.0f ms worst latency" % (
+            self.reloads, os.path.basename(self.target),
+            self.latency / max(self.reloads, 1) * 1000, self.max_latency * 1000
+        )
@@ -0,0 +1,102 @@
+"""
+Follow the tail of a log file.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import mmap
+import os
+import re
+
+__all__ = ("LogTail",)
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+RE_LEVEL = re.compile(r'^(DEBUG|INFO|WARNING|ERROR|CRITICAL):')
+
+
+class LogTail(object):
+    """
+    Read a log file from where the last read stopped.
+
+    The first read only maps in the last `tail_bytes` of the file, so the cost of
+    following the log does not depend on its size.  A file that shrinks or is replaced
+    is read again from its tail.  Optionally only lines at or above `level` are kept;
+    lines without a level belong to the line above them.
+    """
+
+    def __init__(self, path, tail_bytes, level=None):
+        """Setup the tail."""
+
+        self.path = path
+        self.tail_bytes = max(int(tail_bytes), 1)
+        self.level = LEVELS.get(level.upper(), 0) if level else 0
+        self.offset = None
+        self.ident = None
+        self.partial = b''
+        self.keep = True
+
+    def read_bytes(self, start, end):
+        """Read a range of the file through a memory map."""
+
+        if end <= start:
+            return b''
+        with open(self.path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                return mm[start:end]
+            finally:
+                mm.close()
+
+    def filter(self, text):
+        """Drop lines below the minimum level."""
+
+        if not self.level:
+            return text
+        lines = []
+        for line in text.splitlines(True):
+            m = RE_LEVEL.match(line)
+            if m is not None:
+                self.keep = LEVELS[m.group(1)] >= self.level
+            if self.keep:
+                lines.append(line)
+        return ''.join(lines)
+
+    def read(self):
+        """
+        Get the complete lines added since the last read.
+
+        Returns `(text, reset)` where `reset` is true if the text replaces what was read before,
+        because this is the first read or the file was truncated or replaced.
+        """
+
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return '', False
+
+        ident = (st.st_dev, st.st_ino)
+        reset = self.offset is None or ident != self.ident or st.st_size < self.offset
+        if reset:
+            start = max(st.st_size - self.tail_bytes, 0)
+            self.partial = b''
+            self.keep = True
+        else:
+            start = self.offset
+        self.ident = ident
+
+        try:
+            data = self.read_bytes(start, st.st_size)
+        except (OSError, ValueError):
+            return '', False
+        self.offset = start + len(data)
+
+        if reset and start > 0:
+            # Skip the partial line the tail starts in
+            idx = data.find(b'\n')
+            data = data[idx + 1:] if idx != -1 else b''
+
+        data = self.partial + data
+        idx = data.rfind(b'\n')
+        self.partial = data[idx + 1:]
+        data = data[:idx + 1]
+        return self.filter(data.decode('utf-8', 'replace')), reset
@@ -6,10 +6,25 @@ Copyright (c) 2012 Isaac Muse <isaacmuse@gmail.com>
 """
 import sublime
 import re
-from os import walk, listdir
-from os.path import basename, dirname, isdir, join, normpath, splitext, exists
-from fnmatch import fnmatch
-import zipfile
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from os import listdir, sep, stat
+try:
+    from os import scandir
+except ImportError:
+    # Python 3.3
+    scandir = None
+from os.path import basename, dirname, isdir, islink, join, normcase, normpath, splitext, exists
+from fnmatch import fnmatch, translate
+from .timing import INSTRUMENT
+from .zip_listing import zip_names
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
 
 __all__ = (
     "sublime_package_paths",
@@ -18,10 +33,274 @@ __all__ = (
     "get_packages",
     "get_packages_location",
     "get_package_contents",
+    "iter_packages",
+    "iter_package_contents",
+    "iter_folder_resources",
+    "iter_zip_resources",
+    "find_resources",
+    "ResourceIndex",
+    "RESOURCE_INDEX",
+    "FileMatcher",
+    "ResourceSet",
     "PackageSearch"
 )
 
-EXCLUDE_PATTERN = re.compile(r"(?:/|^)(?:[^/]*\.(?:pyc|pyo)|\.git|\.svn|\.hg|\.DS_Store)(?=$|/)")
+# Seconds within which a change may leave a file system timestamp untouched
+MTIME_RESOLUTION = 2.0
+
+EXCLUDE_PATTERN = re.compile(r"(?:/|^)(?:[^/]*\.(?:pyc|pyo)|\.git|\.svn|\.hg|\.DS_Store|__pycache__)(?=$|/)")
+
+
+class ResourceIndex(object):
+    """
+    Process wide cache of package folder and archive listings.
+
+    Archives are keyed on their path, mtime and size.  Folders are keyed on their path and mtime,
+    which changes whenever an entry is added, removed or renamed within them.  Only entries whose
+    key changed since the last scan are read from disk again.  A listing modified too recently
+    for its timestamp to show the next change is not cached.
+    """
+
+    def __init__(self):
+        """Setup the index."""
+
+        self.lock = threading.Lock()
+        self.archives = {}
+        self.folders = {}
+
+    def clear(self):
+        """Forget all cached listings."""
+
+        with self.lock:
+            self.archives.clear()
+            self.folders.clear()
+
+    def signature(self, pth):
+        """Get the mtime and size of a path or `None` if it does not exist."""
+
+        try:
+            st = stat(pth)
+        except OSError:
+            return None
+        return (st.st_mtime, st.st_size)
+
+    def lookup(self, cache, pth, sig):
+        """Get a cached value if the signature still matches, dropping it if the path is gone."""
+
+        with self.lock:
+            if sig is None:
+                cache.pop(pth, None)
+                return None
+            entry = cache.get(pth)
+        return entry[1] if entry is not None and entry[0] == sig else None
+
+    def store(self, cache, pth, sig, value):
+        """Store a value in the cache, unless it may change without changing its signature."""
+
+        if time.time() - sig[0] < MTIME_RESOLUTION:
+            return value
+        with self.lock:
+            cache[pth] = (sig, value)
+        return value
+
+    def archive(self, pth):
+        """Get the file names within an archive in archive order."""
+
+        sig = self.signature(pth)
+        names = self.lookup(self.archives, pth, sig)
+        if names is None:
+            if sig is None:
+                return ()
+            with INSTRUMENT.phase("archive listing"):
+                names = self.store(self.archives, pth, sig, tuple(zip_names(pth)))
+            INSTRUMENT.count("archives opened")
+        else:
+            INSTRUMENT.count("archive cache hits")
+        return names
+
+    def scan(self, pth):
+        """
+        Get the sub folder names, file names and symlinked sub folder names of a folder.
+
+        Entry types come from `scandir` where available, so no extra `stat` is needed per entry.
+        """
+
+        sig = self.signature(pth)
+        listing = self.lookup(self.folders, pth, sig)
+        if listing is None:
+            if sig is None:
+                return (), (), frozenset()
+            dirs = []
+            files = []
+            links = []
+            with INSTRUMENT.phase("listdir"):
+                try:
+                    if scandir is not None:
+                        for entry in scandir(pth):
+                            if entry.is_dir():
+                                dirs.append(entry.name)
+                                if entry.is_symlink():
+                                    links.append(entry.name)
+                            else:
+                                files.append(entry.name)
+                    else:
+                        for item in listdir(pth):
+                            full = join(pth, item)
+                            if isdir(full):
+                                dirs.append(item)
+                                if islink(full):
+                                    links.append(item)
+                            else:
+                                files.append(item)
+                except OSError:
+                    # Skip unreadable folders like `os.walk` does, and try them again next time
+                    return (), (), frozenset()
+            listing = self.store(self.folders, pth, sig, (tuple(dirs), tuple(files), frozenset(links)))
+            INSTRUMENT.count("folders listed")
+        else:
+            INSTRUMENT.count("folder cache hits")
+        return listing
+
+    def listdir(self, pth):
+        """Get the sub folder names and file names of a folder."""
+
+        return self.scan(pth)[:2]
+
+    def walk(self, top, exclude=None, max_depth=None):
+        """
+        Walk a folder top down like `os.walk`, but from the cached listings.
+
+        Folders and files whose names match the `exclude` pattern are left out, so excluded
+        folders are never listed.  Sub folders removed from the yielded folder list are not
+        descended into, and symlinked sub folders are listed but not followed.  With `max_depth`,
+        folders nested deeper than that many levels below `top` are not listed.
+        """
+
+        dirs, files, links = self.scan(top)
+        if exclude is not None:
+            dirs = [d for d in dirs if exclude.search(d) is None]
+            files = [f for f in files if exclude.search(f) is None]
+        dirs = list(dirs)
+        yield top, dirs, list(files)
+        if max_depth is not None:
+            if max_depth <= 0:
+                return
+            max_depth -= 1
+        for d in dirs:
+            if d not in links:
+                for entry in self.walk(join(top, d), exclude, max_depth):
+                    yield entry
+
+
+RESOURCE_INDEX = ResourceIndex()
+
+
+def regex_packages(pattern):
+    """
+    Get the package names a regular expression can match resources in, or `None` for any package.
+
+    The pattern is matched case insensitively from the start of the resource, like `re.match`,
+    so when it begins with literal text like `Packages/Foo/`, only packages named like `Foo` can
+    hold matches.  The name is returned as a case insensitive pattern matching whole names.
+    """
+
+    try:
+        ops = list(sre_parse.parse(pattern))
+    except Exception:
+        return None
+    if ops and ops[0] in ((sre_parse.AT, sre_parse.AT_BEGINNING), (sre_parse.AT, sre_parse.AT_BEGINNING_STRING)):
+        ops.pop(0)
+    literal = []
+    for op, av in ops:
+        if op != sre_parse.LITERAL:
+            break
+        literal.append(chr(av))
+    parts = ''.join(literal).split('/')
+    if len(parts) < 3 or not parts[1] or re.match(re.escape(parts[0]) + r'\Z', "Packages", re.IGNORECASE) is None:
+        return None
+    return re.compile(re.escape(parts[1]) + r'\Z', re.IGNORECASE)
+
+
+class FileMatcher(object):
+    """
+    Match file paths against one or more patterns.
+
+    Patterns are globs (matched like `fnmatch`) or case insensitive regular expressions
+    (matched like `re.match`).  They are compiled once, and a match reports which pattern hit,
+    so several patterns can be searched in a single pass over a listing.
+    """
+
+    def __init__(self, patterns, regex=False):
+        """Compile the patterns."""
+
+        if isinstance(patterns, str):
+            patterns = [patterns]
+        self.patterns = [p.strip() for p in patterns]
+        self.normalize = not regex and sublime.platform() == "windows"
+        if regex:
+            self.compiled = [re.compile(p, re.IGNORECASE).match for p in self.patterns]
+        else:
+            self.compiled = [re.compile(translate(self.normcase(p))).match for p in self.patterns]
+
+    def normcase(self, pth):
+        """Normalize path case like `fnmatch` does."""
+
+        return normcase(pth) if self.normalize else pth
+
+    def match(self, pth):
+        """Return the pattern that matches the path or `None`."""
+
+        pth = self.normcase(pth)
+        for pattern, match in zip(self.patterns, self.compiled):
+            if match(pth) is not None:
+                return pattern
+        return None
+
+
+class ResourceSet(object):
+    """
+    Ordered set of resource names.
+
+    Names compare case insensitively on Windows, like Sublime resolves them there.
+    The first spelling added is the one kept.
+    """
+
+    def __init__(self, items=(), fold_case=None):
+        """Setup the set."""
+
+        self.fold_case = sublime.platform() == "windows" if fold_case is None else fold_case
+        self.items = OrderedDict()
+        for item in items:
+            self.add(item)
+
+    def key(self, item):
+        """Get the lookup key for the item."""
+
+        return item.lower() if self.fold_case else item
+
+    def add(self, item):
+        """Add the item if not already present and return whether it was added."""
+
+        key = self.key(item)
+        if key in self.items:
+            return False
+        self.items[key] = item
+        return True
+
+    def __contains__(self, item):
+        """Check if the item is in the set."""
+
+        return self.key(item) in self.items
+
+    def __iter__(self):
+        """Iterate the items in insertion order."""
+
+        return iter(self.items.values())
+
+    def __len__(self):
+        """Get the number of items."""
+
+        return len(self.items)
 
 
 def sublime_package_paths():
@@ -37,10 +316,11 @@ def sublime_package_paths():
 def scan_for_packages(file_path, archives=False):
     """Look for zipped and unzipped plugins."""
 
+    base, dirs, files = next(RESOURCE_INDEX.walk(file_path, max_depth=0))
     if archives:
-        plugins = [join(file_path, item) for item in listdir(file_path) if fnmatch(item, "*.sublime-package")]
+        plugins = [join(file_path, item) for item in files if fnmatch(item, "*.sublime-package")]
     else:
-        plugins = [join(file_path, item) for item in listdir(file_path) if isdir(join(file_path, item))]
+        plugins = [join(file_path, item) for item in dirs]
 
     return plugins
 
@@ -67,96 +347,162 @@ def get_packages_location():
     return default_pkgs, installed_pkgs, user_pkgs
 
 
-def get_folder_resources(folder_pkg, pkg_name, content_folders, content_files):
-    """Get resources in folder."""
+def iter_folder_resources(folder_pkg, pkg_name):
+    """
+    Iterate the resources in a folder as `(resource, is folder)`.
+
+    Only empty folders are listed as folders.  Sub folders are only read as the iteration reaches them.
+    """
 
     if exists(folder_pkg):
-        for base, dirs, files in walk(folder_pkg):
-            file_objs = []
-            for d in dirs[:]:
-                if EXCLUDE_PATTERN.search(d) is not None:
-                    dirs.remove(d)
+        for base, dirs, files in RESOURCE_INDEX.walk(folder_pkg, EXCLUDE_PATTERN):
             for f in files:
-                if EXCLUDE_PATTERN.search(f) is None:
-                    file_name = join(base, f).replace(folder_pkg, "Packages/%s" % pkg_name, 1).replace("\\", "/")
-                    file_objs.append(file_name)
-                    content_files.append(file_name)
-            if len(file_objs) == 0 and len(dirs) == 0:
-                content_folders.append(base.replace(folder_pkg, "Packages/%s" % pkg_name, 1).replace("\\", "/") + "/")
-
-
-def in_list(x, l):
-    """Find if x (string) is in l (list)."""
-
-    found = False
-    if sublime.platform() == "windows":
-        for item in l:
-            if item.lower() == x.lower():
-                found = True
-                break
-    else:
-        found = x in l
-    return found
+                yield join(base, f).replace(folder_pkg, "Packages/%s" % pkg_name, 1).replace("\\", "/"), False
+            if len(files) == 0 and len(dirs) == 0:
+                yield base.replace(folder_pkg, "Packages/%s" % pkg_name, 1).replace("\\", "/") + "/", True
 
 
-def get_zip_resources(zip_pkg, pkg_name, content_folders, content_files):
-    """Get resources in archive that are not already in the lists."""
+def iter_zip_resources(zip_pkg, pkg_name):
+    """Iterate the resources in an archive as `(resource, is folder)`."""
 
     if exists(zip_pkg):
-        with zipfile.ZipFile(zip_pkg, 'r') as z:
-            for item in z.infolist():
-                file_name = item.filename
-                if EXCLUDE_PATTERN.search(file_name) is None:
-                    package_name = "Packages/%s/%s" % (pkg_name, file_name)
-                    if package_name.endswith('/'):
-                        if not in_list(package_name, content_folders):
-                            content_folders.append(package_name)
-                    elif not package_name.endswith('/'):
-                        if not in_list(package_name, content_files):
-                            content_files.append(package_name)
+        for file_name in RESOURCE_INDEX.archive(zip_pkg):
+            if EXCLUDE_PATTERN.search(file_name) is None:
+                package_name = "Packages/%s/%s" % (pkg_name, file_name)
+                yield package_name, package_name.endswith('/')
 
 
-def get_package_contents(pkg):
-    """Get contents of package."""
+def get_folder_resources(folder_pkg, pkg_name, content_folders, content_files):
+    """Get resources in folder."""
+
+    for resource, is_folder in iter_folder_resources(folder_pkg, pkg_name):
+        (content_folders if is_folder else content_files).add(resource)
+
+
+def get_zip_resources(zip_pkg, pkg_name, content_folders, content_files):
+    """Get resources in archive that are not already in the sets."""
+
+    for resource, is_folder in iter_zip_resources(zip_pkg, pkg_name):
+        (content_folders if is_folder else content_files).add(resource)
+
+
+def iter_package_contents(pkg):
+    """
+    Iterate the contents of a package, folders ending in `/`.
+
+    Loose files are found first, then the installed archive, then the default archive, and a
+    resource overridden by an earlier source is not repeated.  Nothing is read beyond what the
+    caller consumes.
+    """
 
     m = re.match(r"^Packages/([^/]*)/?$", pkg)
     assert(m is not None)
     pkg = m.group(1)
     installed_pth, default_pth, user_pth = sublime_package_paths()
+    seen = ResourceSet()
+
+    for resources in (
+        iter_folder_resources(join(user_pth, pkg), pkg),
+        iter_zip_resources(join(installed_pth, "%s.sublime-package" % pkg), pkg),
+        iter_zip_resources(join(default_pth, "%s.sublime-package" % pkg), pkg)
+    ):
+        for resource, is_folder in resources:
+            if seen.add(resource):
+                yield resource
+
+
+def get_package_contents(pkg):
+    """Get contents of package."""
+
     content_files = []
     content_folders = []
-
-    get_folder_resources(join(user_pth, pkg), pkg, content_folders, content_files)
-    get_zip_resources(join(installed_pth, "%s.sublime-package" % pkg), pkg, content_folders, content_files)
-    get_zip_resources(join(default_pth, "%s.sublime-package" % pkg), pkg, content_folders, content_files)
+    for resource in iter_package_contents(pkg):
+        (content_folders if resource.endswith('/') else content_files).append(resource)
 
     return content_folders + content_files
 
 
-def get_packages():
-    """Get the package names."""
+def iter_packages():
+    """
+    Iterate the package names.
+
+    User packages come first, then installed and default archives, each name once.
+    A location is only scanned once the iteration reaches it.
+    """
 
     installed_pth, default_pth, user_pth = sublime_package_paths()
+    pkgs = ResourceSet()
+    for pth, archives in ((user_pth, False), (installed_pth, True), (default_pth, True)):
+        for pkg in scan_for_packages(pth, archives=archives):
+            name = packagename(pkg)
+            if pkgs.add(name):
+                yield name
 
-    installed_pkgs = scan_for_packages(installed_pth, archives=True)
-    default_pkgs = scan_for_packages(default_pth, archives=True)
-    user_pkgs = scan_for_packages(user_pth)
 
-    pkgs = []
-    for pkg_type in [user_pkgs, installed_pkgs, default_pkgs]:
-        for pkg in pkg_type:
-            name = packagename(pkg)
-            if not in_list(name, pkgs):
-                pkgs.append(name)
+def get_packages():
+    """Get the package names."""
 
+    pkgs = list(iter_packages())
     pkgs.sort()
 
     return pkgs
 
 
+def find_resources(pattern, regex=False):
+    """
+    Find the active resources matching one or more patterns.
+
+    Overridden resources are not included.  Returns `(resource, matched pattern)` pairs.
+    """
+
+    matcher = FileMatcher(pattern, regex)
+    found = []
+    if not regex:
+        seen = set()
+        for p in matcher.patterns:
+            for t in sublime.find_resources(p):
+                if t not in seen:
+                    seen.add(t)
+                    found.append((t, p))
+    else:
+        for t in regex_candidates(matcher.patterns):
+            p = matcher.match(t)
+            if p is not None:
+                found.append((t, p))
+    return found
+
+
+def regex_candidates(patterns):
+    """
+    Get the resources regular expressions need to be run on.
+
+    When every pattern begins with a literal package folder, only those packages are listed,
+    from the cached listings.  Otherwise every resource is.
+    """
+
+    names = [regex_packages(p) for p in patterns]
+    if not names or None in names:
+        return sublime.find_resources("*")
+    ignored = set(sublime.load_settings("Preferences.sublime-settings").get("ignored_packages", []))
+    candidates = []
+    for pkg in iter_packages():
+        if pkg not in ignored and any(name.match(pkg) for name in names):
+            candidates.extend(r for r in iter_package_contents("Packages/%s" % pkg) if not r.endswith('/'))
+    return candidates
+
+
 class PackageSearch(object):
     """Search packages."""
 
+    # Number of threads used to scan packages in `find_raw`.  One scans serially.
+    search_workers = 1
+
+    # Scan in the background and show `find_raw` hits as they arrive,
+    # refreshing the panel at most once per interval (seconds) until it is used.
+    stream_results = False
+    stream_interval = 0.25
+    stream_id = 0
+
     def pre_process(self, **kwargs):
         """Preprocess event."""
 
@@ -171,65 +517,151 @@ class PackageSearch(object):
     ################
     # Qualify Files
     ################
-    def find_files(self, files, file_path, pattern, settings, regex):
-        """Find the file that matches the pattern."""
+    def find_files(self, files, file_path, matcher, settings):
+        """
+        Find the files that match the matcher's patterns.
 
-        for f in files:
-            if regex:
-                if re.match(pattern, f[0], re.IGNORECASE) is not None:
-                    settings.append([f[0].replace(file_path, "").lstrip("\\").lstrip("/"), f[1]])
-            else:
-                if fnmatch(f[0], pattern):
-                    settings.append([f[0].replace(file_path, "").lstrip("\\").lstrip("/"), f[1]])
+        Each hit is added as `[path, package type, matched pattern]`.
+        All the files are expected to live under `file_path`.
+        """
+
+        prefix = len(file_path)
+        count = len(settings)
+        with INSTRUMENT.phase("match"):
+            for f in files:
+                pattern = matcher.match(f[0])
+                if pattern is not None:
+                    settings.append([f[0][prefix:].lstrip("\\/"), f[1], pattern])
+        INSTRUMENT.count("entries scanned", len(files))
+        INSTRUMENT.count("matches", len(settings) - count)
+
+    def split_tags(self, settings):
+        """Strip the matched pattern from each hit, keeping the tags in `matched_patterns`."""
+
+        self.matched_patterns = [item.pop() for item in settings]
+        return settings
+
+    ################
+    # Scan Jobs
+    ################
+    def collect(self, func, *args):
+        """Run a search function against a fresh result list and return the list."""
+
+        settings = []
+        func(settings, *args)
+        return settings
+
+    def iter_jobs(self, jobs):
+        """
+        Run the search jobs and yield each job's results in job order.
+
+        Jobs are spread over a bounded thread pool when `search_workers` allows it.  Only a few
+        jobs more than there are threads are queued at a time, and closing the iteration cancels
+        the queued jobs, so a search that is given up on stops after the jobs already running.
+        """
+
+        workers = min(max(int(self.search_workers), 1), len(jobs))
+        if workers > 1:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            pending = deque()
+            try:
+                for job in jobs:
+                    pending.append(pool.submit(job))
+                    if len(pending) >= workers * 2:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+                pool.shutdown(wait=False)
+        else:
+            for job in jobs:
+                yield job()
+
+    def run_jobs(self, jobs):
+        """Run the search jobs and return each job's results in job order."""
+
+        return list(self.iter_jobs(jobs))
+
+    def gather(self, settings, jobs):
+        """Run the search jobs and merge their results into settings."""
+
+        for results in self.run_jobs(jobs):
+            settings.extend(results)
 
     ################
     # Zipped
     ################
-    def walk_zip(self, settings, plugin, pattern, regex):
+    def walk_zip(self, settings, plugin, matcher):
         """Walk the archived files within the plugin."""
 
-        with zipfile.ZipFile(plugin[0], 'r') as z:
-            zipped = [(join(basename(plugin[0]), normpath(fn)), plugin[1]) for fn in sorted(z.namelist())]
-            self.find_files(zipped, "", pattern, settings, regex)
+        names = RESOURCE_INDEX.archive(plugin[0])
+        zipped = [(join(basename(plugin[0]), normpath(fn)), plugin[1]) for fn in sorted(names)]
+        self.find_files(zipped, "", matcher, settings)
 
-    def get_zip_packages(self, settings, file_path, package_type, pattern, regex=False):
-        """Get all the archived plugins in the plugin folder."""
+    def zip_jobs(self, file_path, package_type, matcher):
+        """Get a search job for each archived plugin in the plugin folder."""
 
         plugins = [
-            (join(file_path, item), package_type) for item in listdir(file_path) if fnmatch(item, "*.sublime-package")
+            (join(file_path, item), package_type)
+            for item in RESOURCE_INDEX.listdir(file_path)[1] if fnmatch(item, "*.sublime-package")
         ]
-        for plugin in plugins:
-            self.walk_zip(settings, plugin, pattern.strip(), regex)
+        return [partial(self.collect, self.walk_zip, plugin, matcher) for plugin in plugins]
 
-    def search_zipped_files(self, settings, pattern, regex):
-        """Search the plugin folders for archived plugins."""
+    def get_zip_packages(self, settings, file_path, package_type, matcher):
+        """Get all the archived plugins in the plugin folder."""
+
+        self.gather(settings, self.zip_jobs(file_path, package_type, matcher))
+
+    def search_zipped_jobs(self, matcher):
+        """Get the search jobs for the archived plugins."""
 
         st_packages = sublime_package_paths()
-        self.get_zip_packages(settings, st_packages[0], "Installed", pattern, regex)
-        self.get_zip_packages(settings, st_packages[1], "Default", pattern, regex)
+        return (
+            self.zip_jobs(st_packages[0], "Installed", matcher) +
+            self.zip_jobs(st_packages[1], "Default", matcher)
+        )
+
+    def search_zipped_files(self, settings, matcher):
+        """Search the plugin folders for archived plugins."""
+
+        self.gather(settings, self.search_zipped_jobs(matcher))
 
     ################
     # Unzipped
     ################
-    def walk(self, settings, file_path, plugin, package_type, pattern, regex=False):
+    def walk(self, settings, file_path, plugin, package_type, matcher):
         """Walk the files within the plugin."""
 
-        for base, dirs, files in walk(plugin):
+        for base, dirs, files in RESOURCE_INDEX.walk(plugin, EXCLUDE_PATTERN):
             files = [(join(base, f), package_type) for f in files]
-            self.find_files(files, file_path, pattern, settings, regex)
+            self.find_files(files, file_path, matcher, settings)
+
+    def unzipped_jobs(self, file_path, package_type, matcher):
+        """Get a search job for each unzipped plugin in the plugin folder."""
 
-    def get_unzipped_packages(self, settings, file_path, package_type, pattern, regex=False):
+        plugins = [join(file_path, item) for item in RESOURCE_INDEX.listdir(file_path)[0]]
+        return [
+            partial(self.collect, self.walk, file_path, plugin, package_type, matcher)
+            for plugin in plugins
+        ]
+
+    def get_unzipped_packages(self, settings, file_path, package_type, matcher):
         """Get all of the plugins in the plugin folder."""
 
-        plugins = [join(file_path, item) for item in listdir(file_path) if isdir(join(file_path, item))]
-        for plugin in plugins:
-            self.walk(settings, file_path, plugin, package_type, pattern.strip(), regex)
+        self.gather(settings, self.unzipped_jobs(file_path, package_type, matcher))
 
-    def search_unzipped_files(self, settings, pattern, regex):
-        """Search the plugin folders for unzipped packages."""
+    def search_unzipped_jobs(self, matcher):
+        """Get the search jobs for the unzipped plugins."""
 
         st_packages = sublime_package_paths()
-        self.get_unzipped_packages(settings, st_packages[2], "Packages", pattern, regex)
+        return self.unzipped_jobs(st_packages[2], "Packages", matcher)
+
+    def search_unzipped_files(self, settings, matcher):
+        """Search the plugin folders for unzipped packages."""
+
+        self.gather(settings, self.search_unzipped_jobs(matcher))
 
     ################
     # Search All
@@ -237,33 +669,195 @@ class PackageSearch(object):
     def find_raw(self, pattern, regex=False):
         """Search all packages regardless of whether it is being overridden."""
 
+        matcher = FileMatcher(pattern, regex)
+        if self.stream_results:
+            self.stream_raw(matcher)
+            return
+
+        # Unzipped and archived plugins share one pool, results are merged in job order
+        with INSTRUMENT.phase("find_raw"):
+            unzipped = self.search_unzipped_jobs(matcher)
+            results = self.run_jobs(unzipped + self.search_zipped_jobs(matcher))
+
         settings = []
-        self.search_unzipped_files(settings, pattern, regex)
+        for found in results[:len(unzipped)]:
+            settings.extend(found)
         self.zipped_idx = len(settings)
-        self.search_zipped_files(settings, pattern, regex)
+        for found in results[len(unzipped):]:
+            settings.extend(found)
+        self.split_tags(settings)
 
         self.window.show_quick_panel(
-            settings,
+            self.raw_items(settings),
             lambda x: self.process_file(x, settings=settings)
         )
 
+    def raw_items(self, settings):
+        """Get the quick panel items for the `[path, package type]` hits `find_raw` found."""
+
+        return settings
+
+    def raw_location(self, item):
+        """
+        Get the `(path, name)` a `find_raw` hit is read from.
+
+        `path` is the loose file, or the archive holding the hit with `name` as its name in the archive.
+        """
+
+        rel, package_type = item[0], item[1]
+        st_packages = sublime_package_paths()
+        if package_type == "Packages":
+            return join(st_packages[2], rel), None
+        archive, name = rel.split(sep, 1)
+        return join(st_packages[0 if package_type == "Installed" else 1], archive), name.replace(sep, "/")
+
+    ################
+    # Stream All
+    ################
+    def stream_raw(self, matcher):
+        """Search all packages in the background, showing hits in the panel as they are found."""
+
+        self.stream_id += 1
+        self.stream_settings = []
+        self.matched_patterns = []
+        self.zipped_idx = 0
+        self.stream_panel = 0
+        self.stream_index = 0
+        self.stream_shown = 0
+        self.stream_highlighted = False
+        self.stream_touched = False
+        stream_id = self.stream_id
+        sublime.status_message("Searching packages...")
+        sublime.set_timeout_async(lambda: self.stream_worker(stream_id, matcher), 0)
+
+    def stream_worker(self, stream_id, matcher):
+        """Scan the packages, unzipped first, and post the hits to the main thread in batches."""
+
+        with INSTRUMENT.phase("find_raw (stream)"):
+            self.stream_scan(stream_id, matcher)
+
+    def stream_scan(self, stream_id, matcher):
+        """Scan the packages for the stream."""
+
+        unzipped = self.search_unzipped_jobs(matcher)
+        jobs = unzipped + self.search_zipped_jobs(matcher)
+        batch = []
+        count = 0
+        zipped_idx = None
+        last = 0
+        results = self.iter_jobs(jobs)
+        for idx, found in enumerate(results):
+            if stream_id != self.stream_id:
+                # A new search started or the panel was closed
+                results.close()
+                return
+            if idx == len(unzipped):
+                zipped_idx = count
+            batch.extend(found)
+            count += len(found)
+            now = time.time()
+            if batch and now - last >= self.stream_interval:
+                self.post_batch(stream_id, batch, zipped_idx, False)
+                batch = []
+                last = now
+        self.post_batch(stream_id, batch, count if zipped_idx is None else zipped_idx, True)
+
+    def post_batch(self, stream_id, batch, zipped_idx, done):
+        """Hand a batch of hits to the main thread."""
+
+        sublime.set_timeout(lambda: self.stream_update(stream_id, batch, zipped_idx, done), 0)
+
+    def stream_update(self, stream_id, batch, zipped_idx, done):
+        """Add a batch of hits and refresh the panel."""
+
+        if stream_id != self.stream_id:
+            return
+        if zipped_idx is not None:
+            self.zipped_idx = zipped_idx
+        self.matched_patterns.extend(item.pop() for item in batch)
+        self.stream_settings.extend(batch)
+        if self.stream_touched:
+            # Showing the panel again would throw away the user's filter and selection
+            if done and len(self.stream_settings) > self.stream_shown:
+                sublime.status_message(
+                    "%d more matches found, search again to see them" % (len(self.stream_settings) - self.stream_shown)
+                )
+            return
+        if done:
+            sublime.status_message("")
+            if not self.stream_settings:
+                self.stream_empty()
+                return
+        if batch:
+            self.stream_show()
+
+    def stream_show(self):
+        """Show the panel with the hits so far, replacing the previous panel."""
+
+        self.stream_panel += 1
+        panel_id = self.stream_panel
+        if self.stream_shown:
+            # Closing the old panel reports a cancel, which `stream_done` ignores as stale
+            self.window.run_command("hide_overlay")
+        self.stream_shown = len(self.stream_settings)
+        self.stream_highlighted = False
+        self.window.show_quick_panel(
+            self.raw_items(self.stream_settings),
+            lambda x: self.stream_done(panel_id, x),
+            0,
+            self.stream_index,
+            lambda x: self.stream_highlight(panel_id, x)
+        )
+
+    def stream_empty(self):
+        """Show that the search found nothing."""
+
+        self.stream_panel += 1
+        self.window.show_quick_panel(
+            ["No matches found"],
+            lambda x: self.process_file(-1, settings=self.stream_settings)
+        )
+
+    def stream_highlight(self, panel_id, value):
+        """
+        Remember the highlighted hit so a refresh keeps it.
+
+        The panel reports the selection it opens with, so only a later or different
+        highlight means the user is using the panel, after which it is left alone.
+        """
+
+        if panel_id == self.stream_panel and value != -1:
+            if self.stream_highlighted or value != self.stream_index:
+                self.stream_touched = True
+            self.stream_highlighted = True
+            self.stream_index = value
+
+    def stream_done(self, panel_id, value):
+        """Handle the panel closing, stopping the scan."""
+
+        if panel_id != self.stream_panel:
+            return
+        self.stream_id += 1
+        self.process_file(value, settings=self.stream_settings)
+
     ################
     # Search Override
     ################
+    def panel_items(self, resources):
+        """Get the quick panel items for the resources `find` found."""
+
+        return resources
+
     def find(self, pattern, regex):
         """Search just the active packages.  Not the ones that have been overridden."""
 
-        resources = []
-        if not regex:
-            resources = sublime.find_resources(pattern)
-        else:
-            temp = sublime.find_resources("*")
-            for t in temp:
-                if re.match(pattern, t, re.IGNORECASE) is not None:
-                    resources.append(t)
+        with INSTRUMENT.phase("find"):
+            found = find_resources(pattern, regex)
+        resources = [f[0] for f in found]
+        self.matched_patterns = [f[1] for f in found]
 
         self.window.show_quick_panel(
-            resources,
+            self.panel_items(resources),
             lambda x: self.process_file(x, settings=resources),
             0,
             0,
@@ -273,12 +867,13 @@ class PackageSearch(object):
     def search(self, **kwargs):
         """Search packages."""
 
-        kwargs = self.pre_process(**kwargs)
-        pattern = kwargs.get("pattern", None)
-        regex = kwargs.get("regex", False)
-        self.find_all = kwargs.get("find_all", False)
+        with INSTRUMENT.phase("search"):
+            kwargs = self.pre_process(**kwargs)
+            pattern = kwargs.get("pattern", None)
+            regex = kwargs.get("regex", False)
+            self.find_all = kwargs.get("find_all", False)
 
-        if not self.find_all:
-            self.find(pattern, regex)
-        else:
-            self.find_raw(pattern, regex)
+            if not self.find_all:
+                self.find(pattern, regex)
+            else:
+                self.find_raw(pattern, regex)
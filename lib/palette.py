@@ -0,0 +1,114 @@
+"""
+Palette summaries of color schemes.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import colorsys
+import json
+import os
+import threading
+from .color_scheme import load_scheme, resolve_variable
+from .transform import parse_color, format_color
+
+__all__ = ("scheme_palette", "describe_palette", "PaletteCache")
+
+VERSION = 1
+
+
+def resolve_color(scheme, value):
+    """Get a `#RRGGBB` color from a setting, following a `var()` reference, or `None`."""
+
+    color = parse_color(resolve_variable(scheme, value))
+    return format_color(color, False) if color is not None else None
+
+
+def scheme_palette(resource, data, decode=json.loads):
+    """
+    Get the background, foreground and accent colors of a tmTheme or sublime-color-scheme.
+
+    The accent is the rule foreground used most, preferring the most saturated on a tie.
+    `dark` is set when the background is dark.  `decode` parses sublime-color-scheme text.
+    """
+
+    scheme = load_scheme(resource, data, decode)
+    scheme_globals = scheme.get("globals", {})
+    background = resolve_color(scheme, scheme_globals.get("background")) or "#FFFFFF"
+    foreground = resolve_color(scheme, scheme_globals.get("foreground")) or "#000000"
+
+    uses = {}
+    for rule in scheme.get("rules", []):
+        color = resolve_color(scheme, rule.get("foreground")) if isinstance(rule, dict) else None
+        if color is not None and color not in (background, foreground):
+            uses[color] = uses.get(color, 0) + 1
+    accent = resolve_color(scheme, scheme_globals.get("caret")) or foreground
+    if uses:
+        accent = max(uses, key=lambda c: (uses[c], colorsys.rgb_to_hls(*parse_color(c)[:3])[2], c))
+
+    r, g, b = parse_color(background)[:3]
+    return {
+        "background": background,
+        "foreground": foreground,
+        "accent": accent,
+        "dark": 0.2126 * r + 0.7152 * g + 0.0722 * b < 0.5
+    }
+
+
+def describe_palette(palette):
+    """Get a one line description of a palette for the scheme picker."""
+
+    return "%s  background %s  foreground %s  accent %s" % (
+        "Dark" if palette["dark"] else "Light", palette["background"], palette["foreground"], palette["accent"]
+    )
+
+
+class PaletteCache(object):
+    """
+    Persistent palettes of schemes.
+
+    Each palette is stored with the resource's source, the archive or loose file it is read from
+    and its modification time, and is only used while the source is unchanged.
+    """
+
+    def __init__(self, path):
+        """Setup the cache."""
+
+        self.path = path
+        self.lock = threading.Lock()
+        self.palettes = None
+
+    def load(self):
+        """Load the cache file once."""
+
+        if self.palettes is None:
+            self.palettes = {}
+            try:
+                with open(self.path, 'r') as f:
+                    cache = json.load(f)
+                if cache.get("version") == VERSION:
+                    self.palettes = cache["palettes"]
+            except Exception:
+                pass
+        return self.palettes
+
+    def get(self, resource, source):
+        """Get the palette of a resource if it is cached for the given `[path, mtime]` source."""
+
+        with self.lock:
+            entry = self.load().get(resource)
+        return entry[1] if entry is not None and entry[0] == source else None
+
+    def update(self, entries):
+        """Store `(resource, source, palette)` entries and save the cache."""
+
+        with self.lock:
+            palettes = self.load()
+            for resource, source, palette in entries:
+                palettes[resource] = [source, palette]
+            folder = os.path.dirname(self.path)
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w') as f:
+                json.dump({"version": VERSION, "palettes": palettes}, f)
+            os.replace(tmp, self.path)
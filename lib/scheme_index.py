@@ -0,0 +1,200 @@
+"""
+Inverted index of the scopes, colors and font styles color schemes use.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from .color_scheme import load_scheme, resolve_variable
+from .transform import parse_color, format_color
+
+__all__ = ("scheme_terms", "parse_query", "SchemeIndex")
+
+VERSION = 1
+KINDS = ("scopes", "colors", "font_styles")
+RE_SELECTOR_SPLIT = re.compile(r'[\s()|&,]+')
+FONT_STYLES = frozenset(("bold", "italic", "underline", "stippled_underline", "squiggly_underline", "glow"))
+
+
+def selector_scopes(selector):
+    """Get the scope names a selector styles, leaving out the ones it excludes."""
+
+    scopes = []
+    for part in selector.split(','):
+        # Everything after ` - ` is excluded
+        part = re.split(r'(?:^|\s)-(?:\s|$)', part)[0]
+        scopes.extend(s for s in RE_SELECTOR_SPLIT.split(part) if s and s != '-')
+    return scopes
+
+
+def scheme_terms(resource, data, decode=json.loads):
+    """
+    Get the scopes, colors and font styles a tmTheme or sublime-color-scheme uses.
+
+    Colors are normalized to `#RRGGBB`, dropping any alpha.  `decode` parses sublime-color-scheme text.
+    """
+
+    scheme = load_scheme(resource, data, decode)
+
+    scopes = set()
+    colors = set()
+    font_styles = set()
+    for settings in [scheme.get("globals", {})] + list(scheme.get("rules", [])):
+        if not isinstance(settings, dict):
+            continue
+        scopes.update(selector_scopes(settings.get("scope", "")))
+        for key, value in settings.items():
+            if not isinstance(value, str):
+                continue
+            value = resolve_variable(scheme, value)
+            if key == "font_style":
+                font_styles.update(s for s in value.split() if s in FONT_STYLES)
+                continue
+            color = parse_color(value)
+            if color is not None:
+                colors.add(format_color(color, False))
+    return {"scopes": sorted(scopes), "colors": sorted(colors), "font_styles": sorted(font_styles)}
+
+
+def parse_query(text):
+    """
+    Get the `(kind, term)` to search for.
+
+    `#RGB` style text is a color, a known font style is a font style, and anything else is a scope.
+    """
+
+    text = text.strip()
+    color = parse_color(text)
+    if color is not None:
+        return "colors", format_color(color, False)
+    if text.lower() in FONT_STYLES:
+        return "font_styles", text.lower()
+    return "scopes", text
+
+
+def scope_related(scope, term):
+    """Check if a scope in a scheme styles the scope searched for, or something within it."""
+
+    return scope == term or term.startswith(scope + '.') or scope.startswith(term + '.')
+
+
+class SchemeIndex(object):
+    """
+    Map the scopes, colors and font styles schemes use back to the schemes.
+
+    Each scheme is parsed once per content hash.  Schemes whose source file is unchanged are
+    not loaded again.  The parsed terms are kept in a JSON cache file between sessions.
+    """
+
+    def __init__(self, path):
+        """Setup the index."""
+
+        self.path = path
+        self.lock = threading.Lock()
+        self.loaded = False
+        self.sources = {}
+        self.terms = {}
+        self.inverted = None
+
+    def load(self):
+        """Load the cache file once."""
+
+        if self.loaded:
+            return
+        self.loaded = True
+        try:
+            with open(self.path, 'r') as f:
+                cache = json.load(f)
+            if cache.get("version") == VERSION:
+                self.sources = cache["sources"]
+                self.terms = cache["terms"]
+        except Exception:
+            pass
+
+    def save(self):
+        """Save the cache file."""
+
+        folder = os.path.dirname(self.path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({"version": VERSION, "sources": self.sources, "terms": self.terms}, f)
+        os.replace(tmp, self.path)
+
+    def update(self, resources, source, loader, decode=json.loads):
+        """
+        Bring the index up to date with the given schemes.
+
+        `source(resource)` gets the signature of the file a resource comes from and `loader(resource)`
+        reads its bytes.  Returns the number of schemes that were parsed.
+        """
+
+        with self.lock:
+            self.load()
+            parsed = 0
+            sources = {}
+            for resource in resources:
+                sig = source(resource)
+                known = self.sources.get(resource)
+                if sig is not None and known is not None and known[0] == sig and known[1] in self.terms:
+                    sources[resource] = known
+                    continue
+                try:
+                    data = loader(resource)
+                    digest = hashlib.sha1(data).hexdigest()
+                    if digest not in self.terms:
+                        self.terms[digest] = scheme_terms(resource, data, decode)
+                        parsed += 1
+                except Exception as e:
+                    print("SchemeEditor: Could not index %s: %s" % (resource, str(e)))
+                    continue
+                sources[resource] = [sig, digest]
+
+            changed = parsed or sources != self.sources
+            self.sources = sources
+            used = set(digest for sig, digest in sources.values())
+            for digest in list(self.terms.keys()):
+                if digest not in used:
+                    del self.terms[digest]
+            if changed:
+                self.inverted = None
+                self.save()
+        return parsed
+
+    def invert(self):
+        """Get the `{kind: {term: [resources]}}` map, building it if needed."""
+
+        if self.inverted is None:
+            inverted = dict((kind, {}) for kind in KINDS)
+            for resource in sorted(self.sources):
+                terms = self.terms[self.sources[resource][1]]
+                for kind in KINDS:
+                    for term in terms[kind]:
+                        inverted[kind].setdefault(term, []).append(resource)
+            self.inverted = inverted
+        return self.inverted
+
+    def query(self, text):
+        """
+        Find the schemes that use a scope, color or font style.
+
+        Returns `(resource, [matched terms])` pairs in resource order.
+        """
+
+        kind, term = parse_query(text)
+        with self.lock:
+            inverted = self.invert()[kind]
+            if kind == "scopes":
+                keys = [scope for scope in inverted if scope_related(scope, term)]
+            else:
+                keys = [term] if term in inverted else []
+            found = {}
+            for key in sorted(keys):
+                for resource in inverted[key]:
+                    found.setdefault(resource, []).append(key)
+        return sorted(found.items())
@@ -0,0 +1,281 @@
+"""
+Scheme temp folder.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from .package_search import RESOURCE_INDEX, sublime_package_paths
+from .timing import INSTRUMENT
+
+__all__ = ("resource_source", "Manifest", "TempFolder")
+
+MANIFEST = ".manifest.json"
+
+
+def resource_source(resource):
+    """
+    Get the file a `Packages/...` resource is loaded from as `[path, mtime, size]`.
+
+    Loose files override the installed archive, which overrides the default archive.
+    Returns `None` if the resource cannot be found.
+    """
+
+    parts = resource.split('/', 2)
+    if len(parts) < 3 or parts[0] != "Packages":
+        return None
+    installed_pth, default_pth, user_pth = sublime_package_paths()
+    for pth in (
+        os.path.join(user_pth, parts[1], os.path.normpath(parts[2])),
+        os.path.join(installed_pth, "%s.sublime-package" % parts[1]),
+        os.path.join(default_pth, "%s.sublime-package" % parts[1])
+    ):
+        sig = RESOURCE_INDEX.signature(pth)
+        if sig is not None:
+            return [pth, sig[0], sig[1]]
+    return None
+
+
+def file_signature(pth):
+    """Get the `[mtime, size]` of a file or `None`."""
+
+    sig = RESOURCE_INDEX.signature(pth)
+    return list(sig) if sig is not None else None
+
+
+class Manifest(object):
+    """JSON record of the files generated in a folder."""
+
+    def __init__(self, folder):
+        """Setup the manifest."""
+
+        self.path = os.path.join(folder, MANIFEST)
+
+    def load(self):
+        """Load the manifest."""
+
+        try:
+            with open(self.path, 'r') as f:
+                manifest = json.load(f)
+            if isinstance(manifest, dict):
+                return manifest
+        except Exception:
+            pass
+        return {}
+
+    def save(self, manifest):
+        """Save the manifest."""
+
+        folder = os.path.dirname(self.path)
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=4, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+class TempFolder(object):
+    """
+    Folder of editable copies of color scheme resources.
+
+    A manifest records the resource each copy came from, the content hash and the source
+    file's signature, so an unchanged scheme is not extracted and written again.  Copies of
+    schemes with the same file name from different packages get distinct names.
+    """
+
+    lock = threading.Lock()
+
+    def __init__(self, folder):
+        """Setup the folder."""
+
+        self.folder = folder
+        self.manifest = Manifest(folder)
+
+    def load(self):
+        """Load the manifest."""
+
+        return self.manifest.load()
+
+    def save(self, manifest):
+        """Save the manifest."""
+
+        self.manifest.save(manifest)
+
+    def name_for(self, manifest, resource):
+        """Get the copy's file name, disambiguating names owned by other resources."""
+
+        name = os.path.basename(resource)
+        stem, ext = os.path.splitext(name)
+        package = resource.split('/')[1] if resource.count('/') > 1 else ''
+        candidates = [name, "%s (%s)%s" % (stem, package, ext)]
+        count = 2
+        while True:
+            for candidate in candidates:
+                entry = manifest.get(candidate)
+                if entry is None or entry.get("resource") == resource:
+                    return candidate
+            candidates = ["%s (%s %d)%s" % (stem, package, count, ext)]
+            count += 1
+
+    def extract(self, resource, loader):
+        """
+        Copy the resource into the folder unless an identical copy is already there.
+
+        `loader` reads the resource's bytes.  Returns the copy's file name.
+        """
+
+        with self.lock:
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+            manifest = self.load()
+            name = self.name_for(manifest, resource)
+            target = os.path.join(self.folder, name)
+            source = resource_source(resource)
+            entry = manifest.get(name)
+
+            if (
+                entry is None or source is None or
+                entry.get("source") != source or
+                entry.get("target") != file_signature(target)
+            ):
+                with INSTRUMENT.phase("extract"):
+                    data = loader(resource)
+                INSTRUMENT.count("bytes extracted", len(data))
+                digest = hashlib.sha1(data).hexdigest()
+                if entry is None or entry.get("hash") != digest or entry.get("target") != file_signature(target):
+                    with open(target, 'wb') as f:
+                        f.write(data)
+                    INSTRUMENT.count("temp copies written")
+                else:
+                    INSTRUMENT.count("temp copies unchanged")
+                entry = {
+                    "resource": resource,
+                    "source": source,
+                    "hash": digest,
+                    "target": file_signature(target)
+                }
+            else:
+                INSTRUMENT.count("temp copies reused")
+
+            entry["used"] = time.time()
+            manifest[name] = entry
+            self.save(manifest)
+        return name
+
+    def write(self, contents):
+        """
+        Store new content as the copies of resources, skipping copies that already hold it.
+
+        `contents` is a list of `(resource, bytes)`.  The manifest is updated once for all of them,
+        and each copy is replaced atomically, so a copy in use is never seen half written.
+        Returns each copy's `(file name, written)` in order.
+        """
+
+        results = []
+        with self.lock:
+            if not os.path.exists(self.folder):
+                os.makedirs(self.folder)
+            manifest = self.load()
+            for resource, data in contents:
+                name = self.name_for(manifest, resource)
+                target = os.path.join(self.folder, name)
+                entry = manifest.get(name)
+                digest = hashlib.sha1(data).hexdigest()
+                written = (
+                    entry is None or entry.get("hash") != digest or
+                    entry.get("target") != file_signature(target)
+                )
+                if written:
+                    tmp = target + '.tmp'
+                    with open(tmp, 'wb') as f:
+                        f.write(data)
+                    os.replace(tmp, target)
+                    INSTRUMENT.count("temp copies written")
+                manifest[name] = {
+                    "resource": resource,
+                    "source": resource_source(resource),
+                    "hash": digest,
+                    "target": file_signature(target),
+                    "used": time.time()
+                }
+                results.append((name, written))
+            self.save(manifest)
+        return results
+
+    def copies(self, manifest):
+        """Get `(last used, size, name)` for each copy in the folder, least recently used first."""
+
+        copies = []
+        for name in os.listdir(self.folder):
+            pth = os.path.join(self.folder, name)
+            if name == MANIFEST or name.endswith('.tmp') or not os.path.isfile(pth):
+                continue
+            st = os.stat(pth)
+            used = manifest.get(name, {}).get("used")
+            copies.append((used if used is not None else st.st_mtime, st.st_size, name))
+        copies.sort()
+        return copies
+
+    def remove(self, manifest, name):
+        """Remove a copy and its manifest entry, returning whether it was removed."""
+
+        try:
+            os.unlink(os.path.join(self.folder, name))
+        except Exception:
+            print("SchemeEditor: Could not remove %s!" % name)
+            return False
+        manifest.pop(name, None)
+        return True
+
+    def pristine(self, manifest, name):
+        """Check if a copy is known to the manifest and unchanged since it was written."""
+
+        entry = manifest.get(name)
+        return entry is not None and entry.get("target") == file_signature(os.path.join(self.folder, name))
+
+    def evict(self, keep=(), max_files=0, max_size=0):
+        """
+        Remove the least recently used copies until the folder is within budget.
+
+        A budget of zero is unlimited.  Copies named in `keep` are never removed, and neither are
+        copies that were edited since they were written, or files the manifest does not know about,
+        as those may hold the user's work.
+        """
+
+        with self.lock:
+            if not os.path.exists(self.folder):
+                return
+            manifest = self.load()
+            copies = self.copies(manifest)
+            count = len(copies)
+            size = sum(c[1] for c in copies)
+            for used, file_size, name in copies:
+                if (not max_files or count <= max_files) and (not max_size or size <= max_size):
+                    break
+                if name in keep or not self.pristine(manifest, name):
+                    continue
+                if self.remove(manifest, name):
+                    count -= 1
+                    size -= file_size
+            # Forget copies that were removed outside of the folder's control
+            for name in list(manifest.keys()):
+                if not os.path.exists(os.path.join(self.folder, name)):
+                    del manifest[name]
+            self.save(manifest)
+
+    def purge(self, keep=()):
+        """Remove every copy except the ones named in `keep`."""
+
+        with self.lock:
+            if not os.path.exists(self.folder):
+                return
+            manifest = self.load()
+            for used, file_size, name in self.copies(manifest):
+                if name not in keep:
+                    self.remove(manifest, name)
+            self.save(manifest)
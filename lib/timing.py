@@ -0,0 +1,108 @@
+"""
+Opt-in timing and counting of hot paths.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import threading
+import time
+from collections import OrderedDict
+
+__all__ = ("Instrumentation", "INSTRUMENT")
+
+
+class NullPhase(object):
+    """Phase that records nothing, used while instrumentation is disabled."""
+
+    def __enter__(self):
+        """Enter the phase."""
+
+        return self
+
+    def __exit__(self, *args):
+        """Exit the phase."""
+
+
+NULL_PHASE = NullPhase()
+
+
+class Phase(object):
+    """Time a block and record it under a phase name."""
+
+    def __init__(self, instrument, name):
+        """Setup the phase."""
+
+        self.instrument = instrument
+        self.name = name
+
+    def __enter__(self):
+        """Start the clock."""
+
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        """Record the time."""
+
+        self.instrument.record(self.name, time.perf_counter() - self.start)
+
+
+class Instrumentation(object):
+    """
+    Record per phase timings and named counters.
+
+    While disabled, `phase` hands out a shared do nothing context manager
+    and `count` returns immediately, so instrumented code pays almost nothing.
+    """
+
+    def __init__(self):
+        """Setup the instrumentation."""
+
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything recorded."""
+
+        with self.lock:
+            self.phases = OrderedDict()
+            self.counts = OrderedDict()
+
+    def phase(self, name):
+        """Get a context manager that times a phase."""
+
+        return Phase(self, name) if self.enabled else NULL_PHASE
+
+    def record(self, name, elapsed):
+        """Record a phase's elapsed time."""
+
+        with self.lock:
+            stats = self.phases.get(name)
+            if stats is None:
+                stats = self.phases[name] = [0, 0.0, 0.0]
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max(stats[2], elapsed)
+
+    def count(self, name, amount=1):
+        """Add to a counter."""
+
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def report(self):
+        """Get the recorded phases and counters."""
+
+        with self.lock:
+            phases = OrderedDict()
+            for name, (calls, total, longest) in self.phases.items():
+                phases[name] = OrderedDict(
+                    [("calls", calls), ("total_ms", round(total * 1000, 3)), ("max_ms", round(longest * 1000, 3))]
+                )
+            return OrderedDict([("enabled", self.enabled), ("phases", phases), ("counts", OrderedDict(self.counts))])
+
+
+INSTRUMENT = Instrumentation()
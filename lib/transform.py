@@ -0,0 +1,139 @@
+"""
+Declarative color scheme transforms.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import colorsys
+import re
+
+__all__ = (
+    "parse_color",
+    "format_color",
+    "shift_hue",
+    "scale_contrast",
+    "load_spec",
+    "transform_tmtheme"
+)
+
+RE_COLOR = re.compile(r'^#(?:[0-9a-fA-F]{3,4}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})$')
+
+OPERATIONS = ("hue_shift", "contrast", "remap")
+
+
+def parse_color(text):
+    """
+    Parse a `#RGB`, `#RGBA`, `#RRGGBB` or `#RRGGBBAA` color into `(r, g, b, a)` floats.
+
+    Returns `None` if the text is not a color.
+    """
+
+    if not isinstance(text, str) or RE_COLOR.match(text) is None:
+        return None
+    digits = text[1:]
+    if len(digits) <= 4:
+        digits = ''.join(c * 2 for c in digits)
+    if len(digits) == 6:
+        digits += 'FF'
+    return tuple(int(digits[i:i + 2], 16) / 255.0 for i in range(0, 8, 2))
+
+
+def format_color(color, alpha=True):
+    """Format `(r, g, b, a)` floats as `#RRGGBB`, or `#RRGGBBAA` if `alpha` is set."""
+
+    channels = color if alpha else color[:3]
+    return '#' + ''.join('%02X' % int(round(min(max(c, 0.0), 1.0) * 255)) for c in channels)
+
+
+def shift_hue(color, degrees):
+    """Rotate a color's hue."""
+
+    h, lightness, s = colorsys.rgb_to_hls(*color[:3])
+    return colorsys.hls_to_rgb((h + degrees / 360.0) % 1.0, lightness, s) + (color[3],)
+
+
+def scale_contrast(color, amount):
+    """Scale how far a color's lightness is from the middle.  Above 1 raises contrast."""
+
+    h, lightness, s = colorsys.rgb_to_hls(*color[:3])
+    return colorsys.hls_to_rgb(h, min(max(0.5 + (lightness - 0.5) * amount, 0.0), 1.0), s) + (color[3],)
+
+
+def load_spec(spec):
+    """
+    Validate a transform spec and get its list of operations.
+
+    The spec is a list of operations, or an object with an `operations` list.  Each operation
+    is applied to every scheme in order:
+
+    - `{"op": "hue_shift", "degrees": 30}` rotates the hue of colors.
+    - `{"op": "contrast", "amount": 1.2}` scales the lightness of colors away from the middle.
+    - `{"op": "remap", "scope": "comment", "color": "#75715E"}` sets the foreground of rules
+      for a scope.  `key` picks a setting other than `foreground`.
+
+    `hue_shift` and `contrast` take optional `keys`, the settings to change (all colors by default),
+    and `scope`, to only change rules for that scope instead of every rule and the globals.
+    """
+
+    operations = spec.get("operations") if isinstance(spec, dict) else spec
+    if not isinstance(operations, list):
+        raise ValueError("A transform spec needs a list of operations")
+    for operation in operations:
+        op = operation.get("op") if isinstance(operation, dict) else None
+        if op not in OPERATIONS:
+            raise ValueError("Unknown transform operation: %s" % str(op))
+        if op == "hue_shift":
+            float(operation["degrees"])
+        elif op == "contrast":
+            float(operation["amount"])
+        elif not operation.get("scope") or parse_color(operation.get("color")) is None:
+            raise ValueError("A remap needs a scope and a color")
+    return operations
+
+
+def rule_scopes(entry):
+    """Get the scopes a tmTheme settings entry applies to."""
+
+    return [scope.strip() for scope in entry.get("scope", "").split(',')]
+
+
+def transform_tmtheme(theme, operations):
+    """
+    Apply the operations to a parsed tmTheme in place.
+
+    Returns the number of settings changed.
+    """
+
+    changed = 0
+    for operation in operations:
+        op = operation["op"]
+        scope = operation.get("scope")
+        for entry in theme.get("settings", []):
+            settings = entry.get("settings")
+            if not isinstance(settings, dict):
+                continue
+            if scope is not None and ("scope" not in entry or scope not in rule_scopes(entry)):
+                continue
+
+            if op == "remap":
+                key = operation.get("key", "foreground")
+                if settings.get(key) != operation["color"]:
+                    settings[key] = operation["color"]
+                    changed += 1
+                continue
+
+            keys = operation.get("keys")
+            for key, value in list(settings.items()):
+                original = parse_color(value)
+                if original is None or (keys is not None and key not in keys):
+                    continue
+                if op == "hue_shift":
+                    color = shift_hue(original, float(operation["degrees"]))
+                else:
+                    color = scale_contrast(original, float(operation["amount"]))
+                alpha = len(value) in (5, 9)
+                text = format_color(color, alpha)
+                if text != format_color(original, alpha):
+                    settings[key] = text
+                    changed += 1
+    return changed
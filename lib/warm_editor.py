@@ -0,0 +1,104 @@
+"""
+Warm standby editor process.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import json
+import subprocess
+import threading
+
+__all__ = ("WarmEditor",)
+
+# Run in place of `-m subclrschm`: import the editor and its GUI toolkit up front,
+# then wait for the command line arguments on stdin before running the editor.
+BOOTSTRAP = '''
+import json, runpy, sys
+try:
+    import subclrschm.lib.gui.subclrschm_app
+except Exception:
+    pass
+line = sys.stdin.readline()
+if line:
+    sys.argv = ["subclrschm"] + json.loads(line)
+    runpy.run_module("subclrschm", run_name="__main__", alter_sys=True)
+'''
+
+
+class WarmEditor(object):
+    """
+    Keep one idle, pre-spawned editor process ready to take a launch.
+
+    Only editors called as `<python> -m subclrschm` can be kept warm.
+    """
+
+    def __init__(self):
+        """Setup the standby."""
+
+        self.lock = threading.Lock()
+        self.process = None
+        self.editor = None
+
+    @staticmethod
+    def supported(editor):
+        """Check if the editor command can be kept warm."""
+
+        return list(editor[-2:]) == ['-m', 'subclrschm']
+
+    def spawn(self, editor, env):
+        """Start a standby process for the editor command unless one is already waiting."""
+
+        if not self.supported(editor):
+            return
+        with self.lock:
+            if self.process is not None:
+                if self.process.poll() is None and self.editor == editor:
+                    return
+                self.stop_process()
+            try:
+                self.process = subprocess.Popen(list(editor[:-2]) + ['-c', BOOTSTRAP], stdin=subprocess.PIPE, env=env)
+                self.editor = list(editor)
+            except Exception as e:
+                print("SchemeEditor: Could not start standby editor: " + str(e))
+
+    def launch(self, editor, args):
+        """Hand the arguments to the standby process and return whether it took them."""
+
+        with self.lock:
+            process = self.process
+            self.process = None
+            if process is None:
+                return False
+            if process.poll() is not None or self.editor != list(editor):
+                self.stop(process)
+                return False
+        try:
+            process.stdin.write((json.dumps(args) + '\n').encode('utf-8'))
+            process.stdin.close()
+        except Exception:
+            self.stop(process)
+            return False
+        return True
+
+    def stop(self, process=None):
+        """Stop an idle process, by default the current standby."""
+
+        if process is None:
+            with self.lock:
+                self.stop_process()
+            return
+        try:
+            if process.poll() is None:
+                process.kill()
+            process.stdin.close()
+            process.wait()
+        except Exception:
+            pass
+
+    def stop_process(self):
+        """Stop the current standby, the lock must be held."""
+
+        if self.process is not None:
+            process = self.process
+            self.process = None
+            self.stop(process)
@@ -0,0 +1,100 @@
+"""
+List the file names in a zip archive from its central directory.
+
+Licensed under MIT
+Copyright (c) 2013 - 2017 Isaac Muse <isaacmuse@gmail.com>
+"""
+import mmap
+import os
+import struct
+import zipfile
+
+__all__ = ("zip_names",)
+
+END_SIG = b"PK\x05\x06"
+END_SIZE = 22
+END_STRUCT = struct.Struct("<4s4H2LH")
+ZIP64_LOCATOR_SIG = b"PK\x06\x07"
+ZIP64_LOCATOR_SIZE = 20
+ENTRY_SIG = b"PK\x01\x02"
+ENTRY_SIZE = 46
+ENTRY_STRUCT = struct.Struct("<4s4xH18x3H")
+MAX_COMMENT = 0xFFFF
+UTF8_FLAG = 0x800
+
+
+def read_names(buf):
+    """
+    Read the entry names from the central directory of an archive in a buffer.
+
+    Returns `None` if the archive is ZIP64, spans disks, or does not look like
+    what this reader expects, so the caller can fall back to `zipfile`.
+    """
+
+    size = len(buf)
+    if size < END_SIZE:
+        return None
+    end = buf.rfind(END_SIG, max(0, size - END_SIZE - MAX_COMMENT), size - END_SIZE + 4)
+    if end < 0:
+        return None
+    sig, disk, cd_disk, disk_entries, entries, cd_size, cd_offset, comment_len = END_STRUCT.unpack_from(buf, end)
+    if (
+        disk != 0 or cd_disk != 0 or disk_entries != entries or
+        entries == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF or
+        (end >= ZIP64_LOCATOR_SIZE and buf[end - ZIP64_LOCATOR_SIZE:end - ZIP64_LOCATOR_SIZE + 4] == ZIP64_LOCATOR_SIG)
+    ):
+        return None
+
+    # Like `zipfile`, locate the directory relative to the end record
+    # so archives with data prepended to them still work.
+    pos = end - cd_size
+    if pos < 0:
+        return None
+    names = []
+    for _ in range(entries):
+        if pos + ENTRY_SIZE > end:
+            return None
+        sig, flags, name_len, extra_len, comment_len = ENTRY_STRUCT.unpack_from(buf, pos)
+        if sig != ENTRY_SIG:
+            return None
+        start = pos + ENTRY_SIZE
+        pos = start + name_len + extra_len + comment_len
+        if pos > end:
+            return None
+        name = buf[start:start + name_len].decode('utf-8' if flags & UTF8_FLAG else 'cp437')
+
+        # Match the clean up `zipfile.ZipInfo` does on names.
+        null_byte = name.find('\x00')
+        if null_byte >= 0:
+            name = name[:null_byte]
+        if os.sep != "/" and os.sep in name:
+            name = name.replace(os.sep, "/")
+        names.append(name)
+    return names
+
+
+def zip_names(pth):
+    """
+    Get the file names within an archive in archive order.
+
+    The archive is memory mapped and only the central directory is read.
+    Archives the reader can't handle are listed with `zipfile`.
+    """
+
+    names = None
+    with open(pth, 'rb') as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, EnvironmentError):
+            buf = None
+        if buf is not None:
+            try:
+                names = read_names(buf)
+            except (struct.error, UnicodeDecodeError):
+                names = None
+            finally:
+                buf.close()
+    if names is None:
+        with zipfile.ZipFile(pth, 'r') as z:
+            names = z.namelist()
+    return names
@@ -0,0 +1,114 @@
+"""
+Run the JSON format validator over a tree.
+
+Files are found in a single pruned walk and validated in a process pool.
+Files that passed before and have not changed since are not checked again.
+"""
+import fnmatch
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import StringIO
+from . import validate_json_format
+
+EXCLUDES = ('.svn', '.git', '.hg', '.tox', '__pycache__')
+CACHE_FILE = '.json_validation_cache'
+
+
+def find_json_files(patterns, folder='.'):
+    """Walk the folder once, skipping excluded folders, and yield files that match a pattern."""
+
+    for root, dirnames, filenames in os.walk(folder):
+        dirnames[:] = [d for d in dirnames if d not in EXCLUDES]
+        for filename in filenames:
+            if any(fnmatch.fnmatch(filename, pattern) for pattern in patterns):
+                yield os.path.join(root, filename)
+
+
+def file_hash(pth):
+    """Get the content hash of a file."""
+
+    with open(pth, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def validate(pth):
+    """Validate a file and return `(path, failed, elapsed, output)`."""
+
+    stdout = sys.stdout
+    sys.stdout = output = StringIO()
+    start = time.time()
+    try:
+        failed = validate_json_format.CheckJsonFormat(False, True).check_format(pth)
+    finally:
+        sys.stdout = stdout
+    return pth, failed, time.time() - start, output.getvalue()
+
+
+class JsonRunner(object):
+    """Validate JSON files, in parallel, skipping files that passed before and have not changed."""
+
+    def __init__(self, cache=CACHE_FILE, workers=None):
+        """Setup the runner."""
+
+        self.cache = cache
+        self.workers = workers or multiprocessing.cpu_count()
+        # Cached passes only count for the validator they were checked with
+        self.validator = file_hash(validate_json_format.__file__.replace('.pyc', '.py'))
+
+    def load_cache(self):
+        """Load the hashes of files that passed."""
+
+        if self.cache is not None and os.path.exists(self.cache):
+            try:
+                with open(self.cache, 'r') as f:
+                    cache = json.load(f)
+                if cache.get('validator') == self.validator:
+                    return cache.get('passed', {})
+            except Exception:
+                pass
+        return {}
+
+    def save_cache(self, passed):
+        """Save the hashes of files that passed."""
+
+        if self.cache is not None:
+            with open(self.cache, 'w') as f:
+                json.dump({'validator': self.validator, 'passed': passed}, f, indent=4, sort_keys=True)
+
+    def run(self, files):
+        """
+        Validate the files.
+
+        Returns `(path, failed, elapsed, output)` for each file, in file order.  Files skipped
+        because they passed before have an elapsed time of `None`.
+        """
+
+        passed = self.load_cache()
+        hashes = {}
+        results = {}
+        pending = []
+        for pth in files:
+            hashes[pth] = file_hash(pth)
+            if passed.get(pth) == hashes[pth]:
+                results[pth] = (pth, False, None, '')
+            else:
+                pending.append(pth)
+
+        if self.workers > 1 and len(pending) > 1:
+            with ProcessPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                checked = list(pool.map(validate, pending))
+        else:
+            checked = [validate(pth) for pth in pending]
+
+        for result in checked:
+            results[result[0]] = result
+
+        self.save_cache(
+            dict((pth, hashes[pth]) for pth in files if not results[pth][1])
+        )
+        return [results[pth] for pth in files]
@@ -0,0 +1,64 @@
+"""Test color scheme conversion."""
+import unittest
+import json
+from lib import color_scheme
+
+TMTHEME = b'''<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
+<plist version="1.0">
+<dict>
+    <key>name</key>
+    <string>Test</string>
+    <key>author</key>
+    <string>Someone</string>
+    <key>settings</key>
+    <array>
+        <dict>
+            <key>settings</key>
+            <dict>
+                <key>background</key>
+                <string>#272822</string>
+                <key>foreground</key>
+                <string>#F8F8F2</string>
+                <key>lineHighlight</key>
+                <string>#3E3D32</string>
+            </dict>
+        </dict>
+        <dict>
+            <key>name</key>
+            <string>Comment</string>
+            <key>scope</key>
+            <string>comment</string>
+            <key>settings</key>
+            <dict>
+                <key>foreground</key>
+                <string>#75715E</string>
+                <key>fontStyle</key>
+                <string>italic</string>
+            </dict>
+        </dict>
+    </array>
+</dict>
+</plist>
+'''
+
+
+class TestConvert(unittest.TestCase):
+    """Test tmTheme to sublime-color-scheme conversion."""
+
+    def test_convert(self):
+        """Test globals and rules are converted."""
+
+        scheme = json.loads(
+            color_scheme.dump_color_scheme(color_scheme.tmtheme_to_color_scheme(color_scheme.parse_tmtheme(TMTHEME)))
+        )
+        self.assertEqual(scheme["name"], "Test")
+        self.assertEqual(scheme["author"], "Someone")
+        self.assertEqual(
+            scheme["globals"],
+            {"background": "#272822", "foreground": "#F8F8F2", "line_highlight": "#3E3D32"}
+        )
+        self.assertEqual(
+            scheme["rules"],
+            [{"name": "Comment", "scope": "comment", "foreground": "#75715E", "font_style": "italic"}]
+        )
@@ -1,23 +1,11 @@
 """Test JSON."""
 import unittest
-from . import validate_json_format
-import os
-import fnmatch
+from . import json_runner
 
 
 class TestSettings(unittest.TestCase):
     """Test JSON settings."""
 
-    def _get_json_files(self, pattern, folder='.'):
-        """Get json files."""
-
-        for root, dirnames, filenames in os.walk(folder):
-            for filename in fnmatch.filter(filenames, pattern):
-                yield os.path.join(root, filename)
-            for dirname in [d for d in dirnames if d not in ('.svn', '.git', '.tox')]:
-                for f in self._get_json_files(pattern, os.path.join(root, dirname)):
-                    yield f
-
     def test_json_settings(self):
         """Test each JSON file."""
 
@@ -29,10 +17,12 @@ class TestSettings(unittest.TestCase):
             '*.sublime-theme'
         )
 
-        for pattern in patterns:
-            for f in self._get_json_files(pattern):
-                print(f)
-                self.assertFalse(
-                    validate_json_format.CheckJsonFormat(False, True).check_format(f),
-                    "%s does not comform to expected format!" % f
-                )
+        files = list(json_runner.find_json_files(patterns))
+        for f, failed, elapsed, output in json_runner.JsonRunner().run(files):
+            print("%s %s" % ("%.4fs" % elapsed if elapsed is not None else "cached ", f))
+            if output:
+                print(output)
+            self.assertFalse(
+                failed,
+                "%s does not comform to expected format!" % f
+            )
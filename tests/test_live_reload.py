@@ -0,0 +1,131 @@
+"""Test the live edit reload bridge."""
+import unittest
+import os
+import shutil
+import tempfile
+import time
+from lib import live_reload
+
+
+class TestLiveReload(unittest.TestCase):
+    """Test coalescing shadow saves into scheme reloads."""
+
+    def setUp(self):
+        """Setup a scheme and its bridge."""
+
+        self.tempdir = tempfile.mkdtemp()
+        self.target = os.path.join(self.tempdir, "Packages", "Test.tmTheme")
+        os.makedirs(os.path.dirname(self.target))
+        with open(self.target, 'wb') as f:
+            f.write(b"original")
+        self.bridge = live_reload.LiveReload(
+            os.path.join(self.tempdir, "Cache", "Test.tmTheme"), self.target, window=60
+        )
+        self.bridge.start()
+
+    def tearDown(self):
+        """Stop the bridge and remove the files."""
+
+        self.bridge.stop()
+        shutil.rmtree(self.tempdir)
+
+    def save(self, data):
+        """Save to the shadow like the editor does."""
+
+        with open(self.bridge.shadow, 'wb') as f:
+            f.write(data)
+
+    def read(self):
+        """Read the scheme."""
+
+        with open(self.target, 'rb') as f:
+            return f.read()
+
+    def test_coalesce(self):
+        """Test a burst of saves is applied as one reload."""
+
+        with open(self.bridge.shadow, 'rb') as f:
+            self.assertEqual(f.read(), b"original")
+        self.assertFalse(self.bridge.apply())
+
+        for data in (b"change 1", b"change 2", b"change 3"):
+            self.save(data)
+        self.assertTrue(self.bridge.apply())
+        self.assertEqual(self.read(), b"change 3")
+        self.assertFalse(self.bridge.apply())
+        self.assertEqual(self.bridge.reloads, 1)
+
+        # Same size, possibly the same timestamp
+        self.save(b"change 4")
+        self.assertTrue(self.bridge.apply())
+        self.assertEqual(self.read(), b"change 4")
+        self.assertEqual(self.bridge.reloads, 2)
+        self.assertFalse(os.path.exists(self.target + '.tmp'))
+
+    def test_stop_applies_pending(self):
+        """Test stopping applies the last save."""
+
+        self.save(b"pending")
+        self.bridge.stop()
+        self.assertEqual(self.read(), b"pending")
+        self.assertIn("1 live reloads", self.bridge.report())
+
+    def test_idle(self):
+        """Test saves made after the bridge went idle still reach the scheme."""
+
+        self.bridge.stop()
+        self.bridge = live_reload.LiveReload(self.bridge.shadow, self.target, window=0.01, idle=0.05, idle_window=0.1)
+        self.bridge.start()
+        time.sleep(0.3)
+        self.assertTrue(self.bridge.thread.is_alive())
+        self.save(b"after idle")
+        for _ in range(50):
+            if self.read() == b"after idle":
+                break
+            time.sleep(0.05)
+        self.assertEqual(self.read(), b"after idle")
+
+    def test_restart_applies_shadow(self):
+        """Test a new bridge applies saves the previous one never did."""
+
+        self.bridge.event.set()
+        self.bridge.thread.join()
+        self.save(b"unapplied")
+        with open(self.target, 'wb') as f:
+            f.write(b"original")
+
+        self.bridge = live_reload.LiveReload(self.bridge.shadow, self.target, window=60)
+        self.bridge.start()
+        self.assertEqual(self.read(), b"unapplied")
+        with open(self.bridge.shadow, 'rb') as f:
+            self.assertEqual(f.read(), b"unapplied")
+        self.assertFalse(self.bridge.apply())
+
+    def test_restart_target_changed(self):
+        """Test a new bridge keeps a scheme changed since the last reload and seeds the shadow from it."""
+
+        self.save(b"v1")
+        self.bridge.stop()
+        self.assertEqual(self.read(), b"v1")
+        with open(self.target, 'wb') as f:
+            f.write(b"v2")
+
+        self.bridge = live_reload.LiveReload(self.bridge.shadow, self.target, window=60)
+        self.bridge.start()
+        self.assertEqual(self.read(), b"v2")
+        with open(self.bridge.shadow, 'rb') as f:
+            self.assertEqual(f.read(), b"v2")
+        self.assertFalse(self.bridge.apply())
+
+    def test_refresh(self):
+        """Test a running bridge seeds its shadow again when the scheme changes under it."""
+
+        self.save(b"v1")
+        self.assertTrue(self.bridge.apply())
+        with open(self.target, 'wb') as f:
+            f.write(b"v2")
+        self.bridge.refresh()
+        with open(self.bridge.shadow, 'rb') as f:
+            self.assertEqual(f.read(), b"v2")
+        self.assertFalse(self.bridge.apply())
+        self.assertEqual(self.read(), b"v2")
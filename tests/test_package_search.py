@@ -0,0 +1,261 @@
+"""Test the package search helpers against the stand-in `sublime` module."""
+import unittest
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+if BENCHMARKS not in sys.path:
+    sys.path.insert(0, BENCHMARKS)
+
+import sublime  # noqa: E402
+from lib import package_search  # noqa: E402
+
+
+class TestResourceIndex(unittest.TestCase):
+    """Test the cached folder listings."""
+
+    def setUp(self):
+        """Setup a temp folder."""
+
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temp folder."""
+
+        shutil.rmtree(self.tempdir)
+
+    def test_scan(self):
+        """Test a folder is listed by entry type."""
+
+        os.makedirs(os.path.join(self.tempdir, 'Sub'))
+        with open(os.path.join(self.tempdir, 'Scheme.tmTheme'), 'w') as f:
+            f.write('<plist/>')
+        index = package_search.ResourceIndex()
+        dirs, files, links = index.scan(self.tempdir)
+        self.assertEqual(dirs, ('Sub',))
+        self.assertEqual(files, ('Scheme.tmTheme',))
+        self.assertEqual(links, frozenset())
+
+    def test_scan_recent(self):
+        """Test a folder changed within the timestamp resolution is listed again."""
+
+        index = package_search.ResourceIndex()
+        mtime = os.stat(self.tempdir).st_mtime
+        self.assertEqual(index.scan(self.tempdir)[1], ())
+        self.assertNotIn(self.tempdir, index.folders)
+        with open(os.path.join(self.tempdir, 'Scheme.tmTheme'), 'w') as f:
+            f.write('<plist/>')
+        # A coarse timestamp can miss the new file
+        os.utime(self.tempdir, (mtime, mtime))
+        self.assertEqual(index.scan(self.tempdir)[1], ('Scheme.tmTheme',))
+
+        os.utime(self.tempdir, (1000000, 1000000))
+        index.scan(self.tempdir)
+        self.assertIn(self.tempdir, index.folders)
+
+    def test_scan_unreadable(self):
+        """Test a folder that cannot be listed is treated as empty and not cached."""
+
+        pth = os.path.join(self.tempdir, 'Scheme.tmTheme')
+        with open(pth, 'w') as f:
+            f.write('<plist/>')
+        index = package_search.ResourceIndex()
+        self.assertEqual(index.scan(pth), ((), (), frozenset()))
+        self.assertNotIn(pth, index.folders)
+        self.assertEqual(list(index.walk(pth)), [(pth, [], [])])
+
+
+class TestFileMatcher(unittest.TestCase):
+    """Test regular expression matching agrees with `re.match`."""
+
+    patterns = [
+        r'Packages/Default/.*\.tmTheme$',
+        r'^Packages/Default/.*\.tmTheme$',
+        r'packages/.*/monokai\.tmtheme',
+        r'Packages/.*\.tmTheme',
+        r'.*\.sublime-color-scheme\Z',
+        r'Packages/(?:Default|User)/[^/]+\.tmTheme$',
+        r'Packages/Color Scheme - Default/(Mariana|Monokai)\.sublime-color-scheme$',
+        r'Packages/a+b{2,3}c*/Scheme\.tmTheme$',
+        r'Packages/k.*k$',
+        r'Packages/Kelvin/Scheme\.tmTheme$',
+        r'Packages/skin/Scheme\.tmTheme$',
+        r'Packages/Icons/.*\.tmTheme$',
+        r'(?x) Packages / Default / .* \.tmTheme $',
+        r'(?-i:Packages)/Default/.*\.tmTheme$',
+        r'(?m)Packages/Default/Scheme\.tmTheme$',
+        r'(?a)Packages/k.*',
+        r'(?s).*\.tmTheme$',
+        r'Packages/Default/Scheme\.tmTheme',
+        r'Packages/Default/Scheme\.tmTheme\Z',
+        r'   Packages/Default/.*\.tmTheme$   '
+    ]
+
+    paths = [
+        'Packages/Default/Scheme.tmTheme',
+        'packages/default/scheme.TMTHEME',
+        'Packages/Default/Scheme.tmTheme.bak',
+        'Packages/Default/Scheme.tmTheme\n',
+        'Packages/Default/Scheme.tmTheme\nPackages/Other',
+        'Packages/User/Monokai.tmTheme',
+        'Packages/User/Sub/Monokai.tmTheme',
+        'Packages/Color Scheme - Default/Mariana.sublime-color-scheme',
+        'Packages/Color Scheme - Default/mariana.SUBLIME-COLOR-SCHEME',
+        'Packages/aabbbcc/Scheme.tmTheme',
+        'Packages/ab/Scheme.tmTheme',
+        'Packages/\u212aelvin/Scheme.tmTheme',
+        'Packages/\u212a/\u212a',
+        'Packages/k/K',
+        'Packages/\u017fkin/Scheme.tmTheme',
+        'Packages/\u0131cons/Scheme.tmTheme',
+        'Packages/\u0130cons/Scheme.tmTheme',
+        'Packages/Icons/Scheme.tmTheme',
+        'Packages/Stra\u00dfe/Scheme.tmTheme',
+        'PACKAGES/Default/Scheme.tmTheme',
+        '',
+        'Packages'
+    ]
+
+    def test_match(self):
+        """Test every pattern matches the same paths as `re.match`."""
+
+        for pattern in self.patterns:
+            matcher = package_search.FileMatcher(pattern, True)
+            for pth in self.paths:
+                expected = re.match(pattern.strip(), pth, re.I) is not None
+                self.assertEqual(
+                    matcher.match(pth) is not None, expected,
+                    "%r against %r" % (pattern, pth)
+                )
+
+    def test_first_pattern(self):
+        """Test the first pattern that matches is reported."""
+
+        matcher = package_search.FileMatcher([r'.*\.sublime-color-scheme$', r'.*\.tmTheme$', r'Packages/.*'], True)
+        self.assertEqual(matcher.match('Packages/Default/Scheme.tmTheme'), r'.*\.tmTheme$')
+        self.assertEqual(matcher.match('Packages/Default/Scheme.hidden-tmTheme'), r'Packages/.*')
+        self.assertIsNone(matcher.match('Default/Scheme.txt'))
+
+
+class TestFindResources(unittest.TestCase):
+    """Test regular expression resource searches."""
+
+    def setUp(self):
+        """Setup an install with loose and archived packages."""
+
+        self.tempdir = tempfile.mkdtemp()
+        sublime.configure(self.tempdir)
+        os.makedirs(sublime.installed_packages_path())
+        os.makedirs(sublime.default_packages_path())
+        for folder, pkg, names in (
+            (
+                sublime.default_packages_path(), 'Default',
+                ['Scheme.tmTheme', 'Sub/Other.TMTHEME', 'Default.sublime-keymap']
+            ),
+            (sublime.installed_packages_path(), 'Monokai', ['Monokai.tmTheme', 'Extra/Monokai Soda.tmTheme']),
+            (sublime.installed_packages_path(), 'Kelvin', ['Kelvin.tmTheme'])
+        ):
+            with zipfile.ZipFile(os.path.join(folder, '%s.sublime-package' % pkg), 'w') as z:
+                for name in names:
+                    z.writestr(name, b'<plist/>')
+        for name in ('Monokai/Monokai.tmTheme', 'Monokai/Loose.tmTheme', 'User/Mine.tmTheme'):
+            pth = os.path.join(sublime.packages_path(), os.path.normpath(name))
+            if not os.path.exists(os.path.dirname(pth)):
+                os.makedirs(os.path.dirname(pth))
+            with open(pth, 'wb') as f:
+                f.write(b'<plist/>')
+        package_search.RESOURCE_INDEX.clear()
+
+    def tearDown(self):
+        """Remove the install."""
+
+        shutil.rmtree(self.tempdir)
+
+    def expected(self, pattern):
+        """Match every resource like `re.match`."""
+
+        return sorted(r for r in sublime.find_resources('*') if re.match(pattern, r, re.I))
+
+    def test_package_patterns(self):
+        """Test patterns within a package only list that package and find the same resources."""
+
+        find_all = sublime.find_resources
+
+        def find_narrow(pattern):
+            """Only allow narrow searches."""
+
+            self.assertNotEqual(pattern, '*')
+            return find_all(pattern)
+
+        sublime.find_resources = find_narrow
+        try:
+            for pattern in (
+                r'Packages/Default/.*\.tmTheme$',
+                r'^packages/monokai/.*\.tmTheme',
+                r'Packages/Monokai/Extra/',
+                r'Packages/\u212aelvin/.*',
+                r'(?x) Packages / User / .*'
+            ):
+                found = sorted(r for r, p in package_search.find_resources(pattern, True))
+                sublime.find_resources = find_all
+                self.assertEqual(found, self.expected(pattern), pattern)
+                self.assertTrue(found, pattern)
+                sublime.find_resources = find_narrow
+        finally:
+            sublime.find_resources = find_all
+
+    def test_ignored_packages(self):
+        """Test ignored packages are not searched."""
+
+        sublime.load_settings('Preferences.sublime-settings').set('ignored_packages', ['Monokai'])
+        self.assertEqual(package_search.find_resources(r'Packages/Monokai/.*', True), [])
+
+    def test_other_patterns(self):
+        """Test patterns that can match in any package search every resource."""
+
+        for pattern in (r'.*\.tmTheme$', r'Packages/(Default|User)/.*', r'Packages/Mono.*', r'Packages/[MK].*'):
+            found = sorted(r for r, p in package_search.find_resources(pattern, True))
+            self.assertEqual(found, self.expected(pattern), pattern)
+            self.assertTrue(found, pattern)
+
+
+class TestSearchJobs(unittest.TestCase):
+    """Test running search jobs on the thread pool."""
+
+    def make_jobs(self, count):
+        """Get jobs that record when they run."""
+
+        self.started = []
+        lock = threading.Lock()
+
+        def job(i):
+            with lock:
+                self.started.append(i)
+            time.sleep(0.02)
+            return [i]
+
+        return [lambda i=i: job(i) for i in range(count)]
+
+    def test_order(self):
+        """Test results come back in job order."""
+
+        search = package_search.PackageSearch()
+        search.search_workers = 4
+        self.assertEqual(list(search.iter_jobs(self.make_jobs(20))), [[i] for i in range(20)])
+
+    def test_close(self):
+        """Test closing the results stops queued jobs from running."""
+
+        search = package_search.PackageSearch()
+        search.search_workers = 2
+        results = search.iter_jobs(self.make_jobs(50))
+        self.assertEqual(next(results), [0])
+        results.close()
+        time.sleep(0.2)
+        self.assertLessEqual(len(self.started), 6)
@@ -0,0 +1,53 @@
+"""Test scheme palettes."""
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from lib import palette
+from tests.test_color_scheme import TMTHEME
+
+
+class TestPalette(unittest.TestCase):
+    """Test palette extraction and caching."""
+
+    def test_tmtheme(self):
+        """Test the palette of a dark tmTheme."""
+
+        result = palette.scheme_palette("Packages/A/Test.tmTheme", TMTHEME)
+        self.assertEqual(result["background"], "#272822")
+        self.assertEqual(result["foreground"], "#F8F8F2")
+        self.assertTrue(result["dark"])
+        self.assertTrue(palette.describe_palette(result).startswith("Dark  background #272822"))
+
+    def test_accent(self):
+        """Test the accent is the most used, then most saturated, rule foreground."""
+
+        scheme = {
+            "variables": {"red": "#FF0000"},
+            "globals": {"background": "#FAFAFA", "foreground": "#333333"},
+            "rules": [
+                {"scope": "comment", "foreground": "#888888"},
+                {"scope": "keyword", "foreground": "var(red)"},
+                {"scope": "string", "foreground": "#333333"}
+            ]
+        }
+        result = palette.scheme_palette("Packages/A/Test.sublime-color-scheme", json.dumps(scheme).encode('utf-8'))
+        self.assertEqual(result["accent"], "#FF0000")
+        self.assertFalse(result["dark"])
+
+    def test_cache(self):
+        """Test cached palettes are only used while the source is unchanged."""
+
+        tempdir = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tempdir, "palettes.json")
+            result = palette.scheme_palette("Packages/A/Test.tmTheme", TMTHEME)
+            palette.PaletteCache(path).update([("Packages/A/Test.tmTheme", ["A.sublime-package", 1.0], result)])
+
+            cache = palette.PaletteCache(path)
+            self.assertEqual(cache.get("Packages/A/Test.tmTheme", ["A.sublime-package", 1.0]), result)
+            self.assertIsNone(cache.get("Packages/A/Test.tmTheme", ["A.sublime-package", 2.0]))
+            self.assertIsNone(cache.get("Packages/B/Test.tmTheme", ["A.sublime-package", 1.0]))
+        finally:
+            shutil.rmtree(tempdir)
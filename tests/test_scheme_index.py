@@ -0,0 +1,91 @@
+"""Test the scheme index."""
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from lib import scheme_index
+from tests.test_color_scheme import TMTHEME
+
+COLOR_SCHEME = json.dumps(
+    {
+        "name": "Other",
+        "variables": {"blue": "#282c34"},
+        "globals": {"background": "var(blue)", "foreground": "#ABB2BF"},
+        "rules": [
+            {"scope": "meta.diff, markup.inserted - meta.separator", "foreground": "#98C379", "font_style": "bold"}
+        ]
+    }
+).encode('utf-8')
+
+
+class TestSchemeIndex(unittest.TestCase):
+    """Test indexing and querying schemes."""
+
+    def setUp(self):
+        """Setup the index."""
+
+        self.tempdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tempdir, "index.json")
+        self.files = {
+            "Packages/A/Test.tmTheme": TMTHEME,
+            "Packages/B/Other.sublime-color-scheme": COLOR_SCHEME
+        }
+        self.loads = []
+        self.versions = {}
+
+    def tearDown(self):
+        """Remove the temp folder."""
+
+        shutil.rmtree(self.tempdir)
+
+    def loader(self, resource):
+        """Load a scheme, counting loads."""
+
+        self.loads.append(resource)
+        return self.files[resource]
+
+    def update(self, index):
+        """Index the schemes."""
+
+        return index.update(
+            sorted(self.files), lambda resource: [resource, self.versions.get(resource, 0)], self.loader
+        )
+
+    def test_terms(self):
+        """Test the terms a color scheme uses."""
+
+        terms = scheme_index.scheme_terms("Packages/B/Other.sublime-color-scheme", COLOR_SCHEME)
+        self.assertEqual(terms["scopes"], ["markup.inserted", "meta.diff"])
+        self.assertEqual(terms["colors"], ["#282C34", "#98C379", "#ABB2BF"])
+        self.assertEqual(terms["font_styles"], ["bold"])
+
+    def test_query(self):
+        """Test queries by scope, color and font style."""
+
+        index = scheme_index.SchemeIndex(self.path)
+        self.assertEqual(self.update(index), 2)
+        self.assertEqual(
+            index.query("meta.diff.header"), [("Packages/B/Other.sublime-color-scheme", ["meta.diff"])]
+        )
+        self.assertEqual(index.query("#282C34"), [("Packages/B/Other.sublime-color-scheme", ["#282C34"])])
+        self.assertEqual(index.query("#272822"), [("Packages/A/Test.tmTheme", ["#272822"])])
+        self.assertEqual(index.query("Bold"), [("Packages/B/Other.sublime-color-scheme", ["bold"])])
+        self.assertEqual(index.query("meta.separator"), [])
+
+    def test_incremental(self):
+        """Test unchanged schemes are not loaded again, even in a new session."""
+
+        self.update(scheme_index.SchemeIndex(self.path))
+        self.assertEqual(len(self.loads), 2)
+
+        index = scheme_index.SchemeIndex(self.path)
+        self.assertEqual(self.update(index), 0)
+        self.assertEqual(len(self.loads), 2)
+
+        self.files["Packages/B/Other.sublime-color-scheme"] = COLOR_SCHEME.replace(b"#98C379", b"#98C37A")
+        self.versions["Packages/B/Other.sublime-color-scheme"] = 1
+        self.assertEqual(self.update(index), 1)
+        self.assertEqual(self.loads[2:], ["Packages/B/Other.sublime-color-scheme"])
+        self.assertEqual(index.query("#98C379"), [])
+        self.assertEqual(len(index.terms), 2)
@@ -0,0 +1,134 @@
+"""Test the temp folder of scheme copies against the stand-in `sublime` module."""
+import unittest
+import os
+import shutil
+import sys
+import tempfile
+
+BENCHMARKS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks')
+if BENCHMARKS not in sys.path:
+    sys.path.insert(0, BENCHMARKS)
+
+import sublime  # noqa: E402
+from lib import temp_folder  # noqa: E402
+
+
+class TestTempFolder(unittest.TestCase):
+    """Test extracting, writing and evicting copies."""
+
+    def setUp(self):
+        """Setup an install with loose schemes and a temp folder."""
+
+        self.tempdir = tempfile.mkdtemp()
+        sublime.configure(self.tempdir)
+        self.folder = temp_folder.TempFolder(os.path.join(self.tempdir, 'Temp'))
+        self.loaded = []
+
+    def tearDown(self):
+        """Remove the install."""
+
+        shutil.rmtree(self.tempdir)
+
+    def add_scheme(self, resource, data, mtime=1000000):
+        """Write a loose scheme for a `Packages/...` resource."""
+
+        pth = os.path.join(sublime.packages_path(), os.path.normpath(resource.split('/', 1)[1]))
+        if not os.path.exists(os.path.dirname(pth)):
+            os.makedirs(os.path.dirname(pth))
+        with open(pth, 'wb') as f:
+            f.write(data)
+        os.utime(pth, (mtime, mtime))
+
+    def loader(self, resource):
+        """Read a loose scheme, recording the read."""
+
+        self.loaded.append(resource)
+        with open(os.path.join(sublime.packages_path(), os.path.normpath(resource.split('/', 1)[1])), 'rb') as f:
+            return f.read()
+
+    def read(self, name):
+        """Read a copy."""
+
+        with open(os.path.join(self.folder.folder, name), 'rb') as f:
+            return f.read()
+
+    def set_used(self, used):
+        """Set when copies were last used."""
+
+        manifest = self.folder.load()
+        for name, value in used.items():
+            manifest[name]["used"] = value
+        self.folder.save(manifest)
+
+    def test_extract_reuse(self):
+        """Test an unchanged scheme is only read once."""
+
+        self.add_scheme('Packages/A/Scheme.tmTheme', b'<plist>a</plist>')
+        name = self.folder.extract('Packages/A/Scheme.tmTheme', self.loader)
+        self.assertEqual(self.folder.extract('Packages/A/Scheme.tmTheme', self.loader), name)
+        self.assertEqual(self.loaded, ['Packages/A/Scheme.tmTheme'])
+        self.assertEqual(self.read(name), b'<plist>a</plist>')
+
+    def test_extract_source_changed(self):
+        """Test a scheme is copied again when its source changes."""
+
+        self.add_scheme('Packages/A/Scheme.tmTheme', b'<plist>a</plist>')
+        name = self.folder.extract('Packages/A/Scheme.tmTheme', self.loader)
+        self.add_scheme('Packages/A/Scheme.tmTheme', b'<plist>changed</plist>', 2000000)
+        self.assertEqual(self.folder.extract('Packages/A/Scheme.tmTheme', self.loader), name)
+        self.assertEqual(len(self.loaded), 2)
+        self.assertEqual(self.read(name), b'<plist>changed</plist>')
+
+    def test_name_for(self):
+        """Test schemes with the same file name from different packages get distinct copies."""
+
+        self.add_scheme('Packages/A/Scheme.tmTheme', b'<plist>a</plist>')
+        self.add_scheme('Packages/B/Scheme.tmTheme', b'<plist>b</plist>')
+        first = self.folder.extract('Packages/A/Scheme.tmTheme', self.loader)
+        second = self.folder.extract('Packages/B/Scheme.tmTheme', self.loader)
+        self.assertEqual(first, 'Scheme.tmTheme')
+        self.assertEqual(second, 'Scheme (B).tmTheme')
+        self.assertEqual(self.read(first), b'<plist>a</plist>')
+        self.assertEqual(self.read(second), b'<plist>b</plist>')
+        self.assertEqual(self.folder.extract('Packages/A/Scheme.tmTheme', self.loader), first)
+
+    def test_write(self):
+        """Test a copy is only written when its content changes."""
+
+        self.add_scheme('Packages/A/Scheme.tmTheme', b'<plist>a</plist>')
+        resource = 'Packages/A/Scheme.tmTheme'
+        self.assertEqual(self.folder.write([(resource, b'<plist>x</plist>')]), [('Scheme.tmTheme', True)])
+        self.assertEqual(self.folder.write([(resource, b'<plist>x</plist>')]), [('Scheme.tmTheme', False)])
+        self.assertEqual(self.folder.write([(resource, b'<plist>y</plist>')]), [('Scheme.tmTheme', True)])
+        self.assertEqual(self.read('Scheme.tmTheme'), b'<plist>y</plist>')
+
+    def test_evict(self):
+        """Test the least recently used copies are removed, except the ones kept."""
+
+        for package in ('A', 'B', 'C'):
+            self.add_scheme('Packages/%s/Scheme.tmTheme' % package, b'<plist>%s</plist>' % package.encode('ascii'))
+        names = [
+            self.folder.extract('Packages/%s/Scheme.tmTheme' % package, self.loader) for package in ('A', 'B', 'C')
+        ]
+        self.set_used(dict((name, used) for used, name in enumerate(names)))
+
+        self.folder.evict(keep=[names[0]], max_files=2)
+        self.assertEqual(sorted(os.listdir(self.folder.folder)), sorted([temp_folder.MANIFEST, names[0], names[2]]))
+        self.assertNotIn(names[1], self.folder.load())
+
+        self.folder.evict(max_files=1)
+        self.assertEqual(sorted(os.listdir(self.folder.folder)), sorted([temp_folder.MANIFEST, names[2]]))
+
+    def test_evict_edited(self):
+        """Test copies edited since they were written are never removed."""
+
+        for package in ('A', 'B'):
+            self.add_scheme('Packages/%s/Scheme.tmTheme' % package, b'<plist>%s</plist>' % package.encode('ascii'))
+        names = [self.folder.extract('Packages/%s/Scheme.tmTheme' % package, self.loader) for package in ('A', 'B')]
+        self.set_used(dict((name, used) for used, name in enumerate(names)))
+        with open(os.path.join(self.folder.folder, names[0]), 'wb') as f:
+            f.write(b'<plist>edited</plist>')
+
+        self.folder.evict(max_files=1)
+        self.assertEqual(sorted(os.listdir(self.folder.folder)), sorted([temp_folder.MANIFEST, names[0]]))
+        self.assertEqual(self.read(names[0]), b'<plist>edited</plist>')
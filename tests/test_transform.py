@@ -0,0 +1,86 @@
+"""Test declarative scheme transforms."""
+import unittest
+from lib import transform
+
+
+def make_theme():
+    """Get a small parsed tmTheme."""
+
+    return {
+        "name": "Test",
+        "settings": [
+            {"settings": {"background": "#FF0000", "foreground": "#808080", "caret": "#FFF"}},
+            {
+                "name": "Comment",
+                "scope": "comment, punctuation.definition.comment",
+                "settings": {"foreground": "#0000FF80"}
+            },
+            {"name": "String", "scope": "string", "settings": {"foreground": "#22AA22", "fontStyle": "italic"}}
+        ]
+    }
+
+
+class TestTransform(unittest.TestCase):
+    """Test transforms."""
+
+    def test_colors(self):
+        """Test color parsing and formatting."""
+
+        self.assertEqual(transform.parse_color("#FFF"), (1.0, 1.0, 1.0, 1.0))
+        self.assertEqual(transform.format_color(transform.parse_color("#0000ff80")), "#0000FF80")
+        self.assertEqual(transform.format_color(transform.parse_color("#0F0"), False), "#00FF00")
+        self.assertIsNone(transform.parse_color("italic"))
+        self.assertIsNone(transform.parse_color("#12345"))
+
+    def test_hue_shift(self):
+        """Test rotating the hue of chosen settings."""
+
+        theme = make_theme()
+        changed = transform.transform_tmtheme(
+            theme, transform.load_spec([{"op": "hue_shift", "degrees": 120, "keys": ["background", "foreground"]}])
+        )
+        settings = theme["settings"]
+        self.assertEqual(changed, 3)
+        self.assertEqual(settings[0]["settings"]["background"], "#00FF00")
+        # Gray has no hue to shift and the caret was not chosen
+        self.assertEqual(settings[0]["settings"]["foreground"], "#808080")
+        self.assertEqual(settings[0]["settings"]["caret"], "#FFF")
+        self.assertEqual(settings[1]["settings"]["foreground"], "#FF000080")
+        self.assertEqual(settings[2]["settings"]["foreground"], "#2222AA")
+        self.assertEqual(settings[2]["settings"]["fontStyle"], "italic")
+
+    def test_contrast_and_remap(self):
+        """Test scoped contrast and a foreground remap."""
+
+        theme = make_theme()
+        changed = transform.transform_tmtheme(
+            theme,
+            transform.load_spec(
+                {
+                    "operations": [
+                        {"op": "contrast", "amount": 2, "scope": "string"},
+                        {"op": "remap", "scope": "punctuation.definition.comment", "color": "#75715E"}
+                    ]
+                }
+            )
+        )
+        settings = theme["settings"]
+        self.assertEqual(changed, 2)
+        self.assertEqual(settings[0]["settings"]["background"], "#FF0000")
+        self.assertEqual(settings[1]["settings"]["foreground"], "#75715E")
+        self.assertEqual(settings[2]["settings"]["foreground"], "#197F19")
+
+        # Already applied
+        self.assertEqual(
+            transform.transform_tmtheme(
+                theme, [{"op": "remap", "scope": "comment", "color": "#75715E"}]
+            ),
+            0
+        )
+
+    def test_invalid_spec(self):
+        """Test invalid specs are rejected."""
+
+        for spec in ({"operations": "hue_shift"}, [{"op": "blur"}], [{"op": "remap", "scope": "comment"}]):
+            with self.assertRaises(ValueError):
+                transform.load_spec(spec)
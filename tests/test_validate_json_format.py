@@ -0,0 +1,51 @@
+"""Test the JSON format validator."""
+import unittest
+import os
+import tempfile
+from . import validate_json_format
+
+
+class RecordJsonFormat(validate_json_format.CheckJsonFormat):
+    """Record failures instead of printing them."""
+
+    def log_failure(self, code, line=None):
+        """Record failure."""
+
+        self.failures.append((code, line))
+        self.fail = True
+
+
+class TestValidateJsonFormat(unittest.TestCase):
+    """Test comment and dangling comma detection."""
+
+    def check(self, text, allow_comments=False):
+        """Check the text and return the failures."""
+
+        fd, pth = tempfile.mkstemp(suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(text)
+            checker = RecordJsonFormat(False, allow_comments)
+            checker.failures = []
+            checker.check_format(pth)
+        finally:
+            os.remove(pth)
+        return checker.failures
+
+    def test_valid(self):
+        """Test valid JSON passes."""
+
+        self.assertEqual(self.check('{\n    "a": [1, 2],\n    "b": "// not a comment,]"\n}\n'), [])
+
+    def test_comments(self):
+        """Test comments are found on their own lines."""
+
+        text = '{\n    // one\n    "a": 1, /* two\n    lines */\n    "b": 2\n}\n'
+        self.assertEqual(self.check(text), [("E1", 2), ("E1", 3)])
+        self.assertEqual(self.check(text, allow_comments=True), [])
+
+    def test_dangling_commas(self):
+        """Test dangling commas are found, even with comments before the bracket."""
+
+        text = '{\n    "a": [\n        1,\n    ],\n    "b": 2, // ["x"]\n    /* } */\n}\n'
+        self.assertEqual(self.check(text, allow_comments=True), [("E2", 3), ("E2", 5)])
@@ -0,0 +1,74 @@
+"""Test listing archive names from the central directory."""
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from lib import zip_listing
+
+
+class TestZipListing(unittest.TestCase):
+    """Test the central directory reader against `zipfile`."""
+
+    def setUp(self):
+        """Setup a temp folder."""
+
+        self.tempdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """Remove the temp folder."""
+
+        shutil.rmtree(self.tempdir)
+
+    def make_archive(self, name, prefix=b"", comment=b""):
+        """Write an archive with a mix of entries and return its path."""
+
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, 'w', zipfile.ZIP_DEFLATED) as z:
+            z.writestr("Folder/", b"")
+            z.writestr("Folder/Scheme.tmTheme", b"<plist/>" * 100)
+            z.writestr("Café.sublime-color-scheme", b"{}")
+            z.writestr("README.md", b"read me")
+            z.comment = comment
+        pth = os.path.join(self.tempdir, name)
+        with open(pth, 'wb') as f:
+            f.write(prefix + data.getvalue())
+        return pth
+
+    def assert_matches_zipfile(self, pth):
+        """Assert the reader lists the same names as `zipfile`."""
+
+        with zipfile.ZipFile(pth, 'r') as z:
+            expected = z.namelist()
+        with open(pth, 'rb') as f:
+            self.assertEqual(zip_listing.read_names(f.read()), expected)
+        self.assertEqual(zip_listing.zip_names(pth), expected)
+
+    def test_names(self):
+        """Test names are read in archive order."""
+
+        self.assert_matches_zipfile(self.make_archive("plain.sublime-package"))
+
+    def test_comment_and_prefix(self):
+        """Test archives with a comment and data prepended to them."""
+
+        self.assert_matches_zipfile(
+            self.make_archive("odd.sublime-package", prefix=b"#!stub\n" * 10, comment=b"archive comment")
+        )
+
+    def test_fallback(self):
+        """Test archives the reader can't handle are listed with `zipfile`."""
+
+        pth = self.make_archive("zip64.sublime-package")
+        with open(pth, 'rb') as f:
+            data = bytearray(f.read())
+        end = data.rfind(zip_listing.END_SIG)
+        # Mark the directory offset as stored in a ZIP64 record.
+        self.assertIsNone(zip_listing.read_names(bytes(data[:end + 16] + b"\xff" * 4 + data[end + 20:])))
+        self.assertIsNone(zip_listing.read_names(b"not an archive"))
+
+        empty = os.path.join(self.tempdir, "empty.sublime-package")
+        open(empty, 'wb').close()
+        with self.assertRaises(zipfile.BadZipfile):
+            zip_listing.zip_names(empty)
@@ -7,40 +7,31 @@ Copyright (c) 2012-2015 Isaac Muse <isaacmuse@gmail.com>
 import re
 import codecs
 import json
+from bisect import bisect_right
 
 RE_LINE_PRESERVE = re.compile(r"\r?\n", re.MULTILINE)
-RE_COMMENT = re.compile(
+RE_NEW_LINE = re.compile(r"\n")
+RE_JSON_TOKEN = re.compile(
     r'''(?x)
         (?P<comments>
             /\*[^*]*\*+(?:[^/*][^*]*\*+)*/  # multi-line comments
           | [ \t]*//(?:[^\r\n])*            # single line comments
         )
-      | (?P<code>
-            "(?:\\.|[^"\\])*"               # double quotes
-          | '(?:\\.|[^'\\])*'               # single quotes
-          | .[^/"']*                        # everything else
-        )
-    ''',
-    re.DOTALL
-)
-RE_TRAILING_COMMA = re.compile(
-    r'''(?x)
-        (
-            (?P<square_comma>
-                ,                        # trailing comma
-                (?P<square_ws>[\s\r\n]*) # white space
-                (?P<square_bracket>\])   # bracket
-            )
-          | (?P<curly_comma>
-                ,                        # trailing comma
-                (?P<curly_ws>[\s\r\n]*)  # white space
-                (?P<curly_bracket>\})    # bracket
+      | (?P<comma>
+            ,                               # trailing comma
+            (?=
+                (?:
+                    \s                      # white space
+                  | /\*[^*]*\*+(?:[^/*][^*]*\*+)*/
+                  | //[^\r\n]*(?![^\r\n])    # or comments
+                )*
+                [\]}]                       # bracket
             )
         )
       | (?P<code>
-            "(?:\\.|[^"\\])*"            # double quoted string
-          | '(?:\\.|[^'\\])*'            # single quoted string
-          | .[^,"']*                     # everything else
+            "(?:\\.|[^"\\])*"               # double quotes
+          | '(?:\\.|[^'\\])*'               # single quotes
+          | .[^/"',]*                       # everything else
         )
     ''',
     re.DOTALL
@@ -90,70 +81,38 @@ class CheckJsonFormat(object):
         self.fail = False
 
     def index_lines(self, text):
-        """Index the char range of each line."""
+        """Index the start offset of each line."""
 
-        self.line_range = []
-        count = 1
-        last = 0
-        for m in re.finditer('\n', text):
-            self.line_range.append((last, m.end(0) - 1, count))
-            last = m.end(0)
-            count += 1
+        self.line_starts = [0] + [m.end(0) for m in RE_NEW_LINE.finditer(text)]
 
     def get_line(self, pt):
         """Get the line from char index."""
 
-        line = None
-        for r in self.line_range:
-            if pt >= r[0] and pt <= r[1]:
-                line = r[2]
-                break
-        return line
+        idx = bisect_right(self.line_starts, pt) - 1
+        # Text after the last new line is not part of a line
+        return idx + 1 if idx < len(self.line_starts) - 1 else None
 
-    def check_comments(self, text):
+    def check_tokens(self, text):
         """
-        Check for JavaScript comments.
+        Check for JavaScript comments and dangling commas.
 
-        Log them and strip them out so we can continue.
+        Log them and strip them out so we can continue.  Comments are replaced by
+        their new lines, so line numbers are preserved.
         """
 
-        def remove_comments(group):
-            return ''.join([x[0] for x in RE_LINE_PRESERVE.findall(group)])
-
-        def evaluate(m):
-            text = ''
-            g = m.groupdict()
-            if g["code"] is None:
+        content = []
+        for m in RE_JSON_TOKEN.finditer(text):
+            code = m.group("code")
+            if code is not None:
+                content.append(code)
+            elif m.group("comma") is not None:
+                # ,] -> ] or ,} -> }
+                self.log_failure(E_COMMA, self.get_line(m.start(0)))
+            else:
                 if not self.allow_comments:
                     self.log_failure(E_COMMENTS, self.get_line(m.start(0)))
-                text = remove_comments(g["comments"])
-            else:
-                text = g["code"]
-            return text
-
-        content = ''.join(map(lambda m: evaluate(m), RE_COMMENT.finditer(text)))
-        return content
-
-    def check_dangling_commas(self, text):
-        """
-        Check for dangling commas.
-
-        Log them and strip them out so we can continue.
-        """
-
-        def check_comma(g, m, line):
-            # ,] -> ] or ,} -> }
-            self.log_failure(E_COMMA, line)
-            if g["square_comma"] is not None:
-                return g["square_ws"] + g["square_bracket"]
-            else:
-                return g["curly_ws"] + g["curly_bracket"]
-
-        def evaluate(m):
-            g = m.groupdict()
-            return check_comma(g, m, self.get_line(m.start(0))) if g["code"] is None else g["code"]
-
-        return ''.join(map(lambda m: evaluate(m), RE_TRAILING_COMMA.finditer(text)))
+                content.extend(RE_LINE_PRESERVE.findall(m.group("comments")))
+        return ''.join(content)
 
     def log_failure(self, code, line=None):
         """
@@ -189,9 +148,7 @@ class CheckJsonFormat(object):
             text = f.read()
 
         self.index_lines(text)
-        text = self.check_comments(text)
-        self.index_lines(text)
-        text = self.check_dangling_commas(text)
+        text = self.check_tokens(text)
         try:
             json.loads(text)
         except Exception as e: